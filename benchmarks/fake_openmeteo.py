@@ -0,0 +1,204 @@
+"""
+Local stand-in for the Open-Meteo forecast and air-quality APIs.
+
+Answers `format=flatbuffers` requests with realistic, deterministic hourly
+temperature and PM2.5 series for any number of locations, and serves a
+synthetic district list for DISTRICT_DATA_URL. Latency and error rate are
+configurable so client behaviour can be measured without the real API.
+
+    python -m benchmarks.fake_openmeteo --port 8081 --latency-ms 150 --error-rate 0.01
+
+Point the app at it with:
+
+    OPENMETEO_WEATHER_URL=http://127.0.0.1:8081/v1/forecast
+    OPENMETEO_AIR_URL=http://127.0.0.1:8081/v1/air-quality
+    DISTRICT_DATA_URL=http://127.0.0.1:8081/districts.json
+"""
+import asyncio
+import argparse
+import datetime
+import random
+import zlib
+import flatbuffers
+import numpy as np
+from aiohttp import web
+from zoneinfo import ZoneInfo
+from openmeteo_sdk.Variable import Variable
+from openmeteo_sdk.Unit import Unit
+
+
+VARIABLES = {
+    "temperature_2m": (Variable.temperature, Unit.celsius),
+    "pm2_5": (Variable.pm2p5, Unit.micrograms_per_cubic_metre),
+}
+
+# Bangladesh bounding box used for the synthetic districts
+_LAT_RANGE = (20.8, 26.5)
+_LONG_RANGE = (88.1, 92.6)
+
+
+def synthetic_districts(count=64):
+    rng = np.random.default_rng(64)
+    lats = rng.uniform(*_LAT_RANGE, count)
+    longs = rng.uniform(*_LONG_RANGE, count)
+    return [
+        {
+            "id": str(i + 1),
+            "division_id": str(i % 8 + 1),
+            "name": f"District {i + 1:02d}",
+            "bn_name": f"জেলা {i + 1:02d}",
+            "lat": f"{lats[i]:.7f}",
+            "long": f"{longs[i]:.7f}",
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_series(variable, lat, long, times):
+    """Diurnal temperature cycle or PM2.5 level, deterministic per location."""
+    seed = zlib.crc32(f"{variable}|{lat:.4f}|{long:.4f}".encode())
+    rng = np.random.default_rng(seed)
+    local_hour = ((times // 3600) + 6) % 24
+    if variable == "temperature_2m":
+        base = 33.0 - (lat - _LAT_RANGE[0]) * 1.2
+        values = base + 5.0 * np.sin((local_hour - 9) / 24 * 2 * np.pi) + rng.normal(0, 0.8, len(times))
+    else:
+        base = 40.0 + (long - _LONG_RANGE[0]) * 12.0
+        values = base + 15.0 * np.cos(local_hour / 24 * 2 * np.pi) + rng.normal(0, 4.0, len(times))
+        values = np.clip(values, 1.0, None)
+    return values.astype(np.float32)
+
+
+def build_message(lat, long, variable, start, end, utc_offset, interval=3600):
+    """One size-prefixed `WeatherApiResponse` with a single hourly variable."""
+    times = np.arange(start, end, interval, dtype=np.int64)
+    values = synthetic_series(variable, lat, long, times)
+    variable_id, unit = VARIABLES[variable]
+
+    builder = flatbuffers.Builder(1024 + 4 * len(values))
+    values_vector = builder.CreateNumpyVector(values)
+
+    # VariableWithValues: variable, unit, value, values
+    builder.StartObject(4)
+    builder.PrependUint8Slot(0, variable_id, 0)
+    builder.PrependUint8Slot(1, unit, 0)
+    builder.PrependUOffsetTRelativeSlot(3, values_vector, 0)
+    variable_table = builder.EndObject()
+
+    builder.StartVector(4, 1, 4)
+    builder.PrependUOffsetTRelative(variable_table)
+    variables_vector = builder.EndVector()
+
+    # VariablesWithTime: time, time_end, interval, variables
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, end, 0)
+    builder.PrependInt32Slot(2, interval, 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables_vector, 0)
+    hourly = builder.EndObject()
+
+    timezone = builder.CreateString("Asia/Dhaka")
+    abbreviation = builder.CreateString("GMT+6")
+
+    # WeatherApiResponse: latitude .. timezone_abbreviation, hourly (slot 11)
+    builder.StartObject(15)
+    builder.PrependFloat32Slot(0, lat, 0)
+    builder.PrependFloat32Slot(1, long, 0)
+    builder.PrependFloat32Slot(2, 10.0, 0)
+    builder.PrependFloat32Slot(3, 0.5, 0)
+    builder.PrependInt32Slot(6, utc_offset, 0)
+    builder.PrependUOffsetTRelativeSlot(7, timezone, 0)
+    builder.PrependUOffsetTRelativeSlot(8, abbreviation, 0)
+    builder.PrependUOffsetTRelativeSlot(11, hourly, 0)
+    builder.FinishSizePrefixed(builder.EndObject())
+    return bytes(builder.Output())
+
+
+def _time_window(query, tz):
+    """Resolves Open-Meteo window parameters to UTC [start, end) seconds."""
+    def epoch(local):
+        return int(local.replace(tzinfo=tz).timestamp())
+
+    if "start_hour" in query:
+        start = datetime.datetime.fromisoformat(query["start_hour"])
+        end = datetime.datetime.fromisoformat(query.get("end_hour", query["start_hour"]))
+        return epoch(start), epoch(end) + 3600
+
+    if "start_date" in query:
+        start = datetime.datetime.fromisoformat(query["start_date"])
+        end = datetime.datetime.fromisoformat(query.get("end_date", query["start_date"]))
+        return epoch(start), epoch(end + datetime.timedelta(days=1))
+
+    today = datetime.datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    days = int(query.get("forecast_days", 7))
+    return epoch(today), epoch(today + datetime.timedelta(days=days))
+
+
+class FakeOpenMeteo:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.bytes_sent = 0
+
+    async def _delay(self):
+        latency = max(0.0, self.random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        if latency:
+            await asyncio.sleep(latency)
+
+    async def forecast(self, request):
+        self.requests += 1
+        await self._delay()
+        if self.random.random() < self.error_rate:
+            return web.Response(status=502, text="Injected upstream error")
+
+        query = request.query
+        variable = query.get("hourly")
+        if variable not in VARIABLES:
+            return web.json_response({"error": True, "reason": f"Unsupported variable {variable}"}, status=400)
+
+        tz = ZoneInfo(query.get("timezone", "GMT"))
+        try:
+            start, end = _time_window(query, tz)
+            lats = [float(v) for v in query["latitude"].split(",")]
+            longs = [float(v) for v in query["longitude"].split(",")]
+        except (KeyError, ValueError) as e:
+            return web.json_response({"error": True, "reason": f"Invalid parameters: {e}"}, status=400)
+
+        utc_offset = int(datetime.datetime.fromtimestamp(start, tz).utcoffset().total_seconds())
+        body = b"".join(
+            build_message(lat, long, variable, start, end, utc_offset)
+            for lat, long in zip(lats, longs)
+        )
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="application/octet-stream")
+
+    async def districts(self, request):
+        return web.json_response({"districts": synthetic_districts()})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/v1/forecast", self.forecast)
+        app.router.add_get("/v1/air-quality", self.forecast)
+        app.router.add_get("/districts.json", self.districts)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean injected latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Standard deviation of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 502")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeOpenMeteo(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    web.run_app(fake.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+End-to-end latency benchmark for the core endpoints under concurrent load.
+
+Run the fake upstream and the app against it, then:
+
+    python -m benchmarks.load --target http://127.0.0.1:8000 --concurrency 32 --requests 1000
+
+Reports p50/p95/p99 latency, throughput and error counts per endpoint.
+"""
+import time
+import json
+import uuid
+import random
+import asyncio
+import argparse
+import datetime
+import aiohttp
+import numpy as np
+
+
+BEST_CITIES = "/api/core/best-cities-to-visit/"
+TRAVEL_RECOMMENDATION = "/api/core/travel-recommendation/"
+
+
+async def obtain_token(session, target):
+    username = f"bench-{uuid.uuid4().hex[:12]}"
+    password = uuid.uuid4().hex
+    async with session.post(f"{target}/api/auth/signup/", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": password,
+        "password2": password,
+    }) as response:
+        response.raise_for_status()
+        return (await response.json())["access"]
+
+
+async def load_destinations(session, districts_url):
+    async with session.get(districts_url) as response:
+        response.raise_for_status()
+        return [d["name"] for d in (await response.json(content_type=None))["districts"]]
+
+
+def travel_query(destinations, rng):
+    return {
+        "destination": rng.choice(destinations),
+        "lat": f"{rng.uniform(20.8, 26.5):.4f}",
+        "long": f"{rng.uniform(88.1, 92.6):.4f}",
+        "date": (datetime.date.today() + datetime.timedelta(days=rng.randint(1, 6))).isoformat(),
+    }
+
+
+async def run_endpoint(session, url, total, concurrency, query_factory=None):
+    latencies = []
+    statuses = {}
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(query_factory() if query_factory else None)
+
+    async def worker():
+        while not queue.empty():
+            params = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                async with session.get(url, params=params) as response:
+                    await response.read()
+                    status = response.status
+            except aiohttp.ClientError:
+                status = "error"
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def summarize(name, latencies, statuses, elapsed):
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "endpoint": name,
+        "requests": len(latencies),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "statuses": {str(k): v for k, v in statuses.items()},
+    }
+
+
+async def benchmark(args):
+    rng = random.Random(args.seed)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = args.token or await obtain_token(session, args.target)
+        session.headers["Authorization"] = f"Bearer {token}"
+
+        results = []
+        if "best-cities" in args.endpoints:
+            results.append(summarize(BEST_CITIES, *await run_endpoint(
+                session, f"{args.target}{BEST_CITIES}", args.requests, args.concurrency
+            )))
+        if "travel" in args.endpoints:
+            destinations = await load_destinations(session, args.districts_url)
+            results.append(summarize(TRAVEL_RECOMMENDATION, *await run_endpoint(
+                session, f"{args.target}{TRAVEL_RECOMMENDATION}", args.requests, args.concurrency,
+                query_factory=lambda: travel_query(destinations, rng)
+            )))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="http://127.0.0.1:8000", help="Base URL of the running app")
+    parser.add_argument("--districts-url", default="http://127.0.0.1:8081/districts.json",
+                        help="District list used to pick travel destinations")
+    parser.add_argument("--token", default=None, help="JWT access token; a throwaway user is created if omitted")
+    parser.add_argument("--endpoints", nargs="+", default=["best-cities", "travel"], choices=["best-cities", "travel"])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'endpoint':<36} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}  statuses")
+    for r in results:
+        print(
+            f"{r['endpoint']:<36} {r['requests']:>6} {r['p50_ms']:>9} {r['p95_ms']:>9} "
+            f"{r['p99_ms']:>9} {r['throughput_rps']:>8}  {r['statuses']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-request cost of turning the top-districts ranking into response bytes: DRF
+serializer plus the stock JSONRenderer, serializer plus FastJSONRenderer, and
+the body pre-rendered once per snapshot.
+
+    python -m benchmarks.render --districts 64 --k 10 --repeat 2000
+"""
+import os
+import json
+import argparse
+import timeit
+import numpy as np
+
+
+def ranking(n):
+    rng = np.random.default_rng(0)
+    return [
+        {
+            "district_name": f"District {i:02d}",
+            "avg_temperature_2pm": float(rng.uniform(20, 35)),
+            "avg_pm2_5": float(rng.uniform(10, 80)),
+            "lat": f"{20 + i / 10:.4f}",
+            "long": f"{88 + i / 10:.4f}",
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--districts", type=int, default=64)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--settings", default="config.django.prod")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", args.settings)
+    os.environ.setdefault("DISTRICT_WARMUP", "False")
+    import django
+    django.setup()
+    from rest_framework.renderers import JSONRenderer
+    from core.renderers import FastJSONRenderer
+    from core.serializers import DistrictAirWeatherSerializer
+
+    records = ranking(args.districts)
+    data = DistrictAirWeatherSerializer(records[:args.k], many=True).data
+    prerendered = {}
+
+    def drf():
+        return JSONRenderer().render(DistrictAirWeatherSerializer(records[:args.k], many=True).data)
+
+    def fast():
+        return FastJSONRenderer().render(DistrictAirWeatherSerializer(records[:args.k], many=True).data)
+
+    def cached():
+        body = prerendered.get(args.k)
+        if body is None:
+            body = prerendered[args.k] = fast()
+        return body
+
+    result = {"districts": args.districts, "k": args.k}
+    for name, render in [
+        ("json_render", lambda: JSONRenderer().render(data)),
+        ("orjson_render", lambda: FastJSONRenderer().render(data)),
+        ("drf_serializer_json", drf),
+        ("drf_serializer_orjson", fast),
+        ("prerendered", cached),
+    ]:
+        seconds = min(timeit.repeat(render, number=args.repeat, repeat=5)) / args.repeat
+        result[f"{name}_us"] = round(seconds * 1e6, 2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    for key, value in result.items():
+        print(f"{key:<28} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Worker startup cost: wall time and peak RSS of a fresh interpreter that sets up
+Django and imports the application modules a worker loads before serving.
+
+    python -m benchmarks.startup --runs 10
+
+Each run is a separate process, so nothing is shared through the import cache.
+"""
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+
+WORKER_IMPORTS = """
+import os, time, resource, sys
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", {settings!r})
+started = time.perf_counter()
+import django
+django.setup()
+import config.urls
+import core.views
+elapsed = time.perf_counter() - started
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, rss_kb, "pandas" in sys.modules)
+"""
+
+
+def measure(settings):
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER_IMPORTS.format(settings=settings)],
+        check=True, capture_output=True, text=True
+    )
+    elapsed, rss_kb, pandas_loaded = result.stdout.split()[-3:]
+    return float(elapsed), int(rss_kb) / 1024, pandas_loaded == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--settings", default="config.django.prod")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    runs = [measure(args.settings) for _ in range(args.runs)]
+    times = np.array([r[0] for r in runs]) * 1000
+    rss = np.array([r[1] for r in runs])
+    result = {
+        "runs": args.runs,
+        "startup_ms_median": round(float(np.median(times)), 1),
+        "startup_ms_min": round(float(times.min()), 1),
+        "peak_rss_mb_median": round(float(np.median(rss)), 1),
+        "pandas_imported": any(r[2] for r in runs),
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    for key, value in result.items():
+        print(f"{key:<20} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,3 +15,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault(env('DJANGO_SETTINGS_MODULE'), 'config.django.dev')
 
 application = get_asgi_application()
+
+# Only serving processes load the district list up front; management commands don't.
+from utils.district_data_loader import warm_up
+warm_up()
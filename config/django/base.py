@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.SamplingProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -134,4 +136,6 @@ STATIC_ROOT = 'content/static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
-from config.settings.simple_jwt import *
\ No newline at end of file
+from config.settings.simple_jwt import *
+from config.settings.weather import *
+from config.settings.observability import *
\ No newline at end of file
@@ -16,4 +16,6 @@ SPECTACULAR_SETTINGS = {
     'DESCRIPTION': 'Travel Recommendation based on weather and air quality.',
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
-}
\ No newline at end of file
+}
+# Tests patch the district list; don't fetch it in the background
+DISTRICT_WARMUP = False
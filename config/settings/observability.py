@@ -0,0 +1,19 @@
+from config.env import env, BASE_DIR
+
+
+# Prometheus-format stage histograms at /api/core/metrics/ (see utils/timing.py).
+# Off unless METRICS_ENABLED is set, since the endpoint is anonymous without a token;
+# when METRICS_TOKEN is set, scrapers must send `Authorization: Bearer <token>`.
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=False)
+METRICS_TOKEN = env('METRICS_TOKEN', default=None)
+
+# Sampling profiler (see utils/sampling_profiler.py), the production-safe alternative to silk.
+# Profiles every PROFILER_SAMPLE_RATE-th request plus any request slower than
+# PROFILER_LATENCY_THRESHOLD_MS, writing folded stacks to PROFILER_OUTPUT_DIR.
+# Admins can switch it at runtime via /api/core/profiler/, which writes PROFILER_CONTROL_PATH.
+PROFILER_ENABLED = env.bool('PROFILER_ENABLED', default=False)
+PROFILER_SAMPLE_RATE = env.int('PROFILER_SAMPLE_RATE', default=100)
+PROFILER_LATENCY_THRESHOLD_MS = env.float('PROFILER_LATENCY_THRESHOLD_MS', default=1000)
+PROFILER_INTERVAL_MS = env.float('PROFILER_INTERVAL_MS', default=5)
+PROFILER_OUTPUT_DIR = env('PROFILER_OUTPUT_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILER_CONTROL_PATH = env('PROFILER_CONTROL_PATH', default=str(BASE_DIR / 'profiler.json'))
@@ -0,0 +1,61 @@
+from config.env import env, BASE_DIR
+
+
+# Upstream endpoints; point these at benchmarks/fake_openmeteo.py to run without the real API
+OPENMETEO_WEATHER_URL = env('OPENMETEO_WEATHER_URL', default='https://api.open-meteo.com/v1/forecast')
+OPENMETEO_AIR_URL = env('OPENMETEO_AIR_URL', default='https://air-quality-api.open-meteo.com/v1/air-quality')
+
+# Top-districts ranking snapshot (see utils/ranking_snapshot.py).
+# The refresher rebuilds the snapshot every RANKING_REFRESH_INTERVAL seconds;
+# a snapshot older than RANKING_MAX_STALENESS is never served and is rebuilt inline.
+RANKING_REFRESH_INTERVAL = env.int('RANKING_REFRESH_INTERVAL', default=900)
+RANKING_MAX_STALENESS = env.int('RANKING_MAX_STALENESS', default=3600)
+RANKING_SNAPSHOT_PATH = env('RANKING_SNAPSHOT_PATH', default=str(BASE_DIR / 'rankings.json'))
+
+# Directory for cross-worker lock files that coalesce identical Open-Meteo fetches
+# across processes on one host (POSIX only). Leave unset to coalesce per process only.
+OPENMETEO_LOCK_DIR = env('OPENMETEO_LOCK_DIR', default=None)
+
+# Open-Meteo resilience (see utils/openmateo_client.py).
+# Expired responses are served for up to OPENMETEO_STALE_TTL seconds while a
+# background refresh runs; set OPENMETEO_SERVE_STALE=False to always wait for upstream.
+# Ranking snapshots are always built from unexpired responses.
+OPENMETEO_SERVE_STALE = env.bool('OPENMETEO_SERVE_STALE', default=True)
+OPENMETEO_STALE_TTL = env.int('OPENMETEO_STALE_TTL', default=6 * 3600)
+# After this many consecutive upstream failures calls fail fast for the reset timeout
+OPENMETEO_BREAKER_FAILURES = env.int('OPENMETEO_BREAKER_FAILURES', default=5)
+OPENMETEO_BREAKER_RESET_TIMEOUT = env.int('OPENMETEO_BREAKER_RESET_TIMEOUT', default=30)
+# Total time budget (seconds) of one upstream fetch, retries and backoff included
+OPENMETEO_REQUEST_DEADLINE = env.float('OPENMETEO_REQUEST_DEADLINE', default=8.0)
+# Fire a duplicate request when the first has not answered after this many seconds (0 disables)
+OPENMETEO_HEDGE_DELAY = env.float('OPENMETEO_HEDGE_DELAY', default=0)
+# Keep-alive connections per upstream client; caps the Open-Meteo calls one worker has in flight
+OPENMETEO_POOL_SIZE = env.int('OPENMETEO_POOL_SIZE', default=20)
+
+# District list (see utils/district_data_loader.py). Loaded in the background when
+# a server process starts and DISTRICT_WARMUP is on; a missing file is fetched with
+# DISTRICT_FETCH_RETRIES retries and exponential backoff, and a failed load is
+# retried after DISTRICT_RETRY_AFTER seconds instead of being kept forever.
+DISTRICT_DATA_URL = env('DISTRICT_DATA_URL', default=None)
+DISTRICT_DATA_PATH = env('DISTRICT_DATA_PATH', default=str(BASE_DIR / 'data.json'))
+DISTRICT_WARMUP = env.bool('DISTRICT_WARMUP', default=True)
+DISTRICT_FETCH_RETRIES = env.int('DISTRICT_FETCH_RETRIES', default=3)
+DISTRICT_FETCH_BACKOFF = env.float('DISTRICT_FETCH_BACKOFF', default=0.5)
+DISTRICT_RETRY_AFTER = env.int('DISTRICT_RETRY_AFTER', default=30)
+
+# Travel recommendations with source_mode=nearest compare from the closest district
+# when it is at most this far (km) from the given source coordinate
+SOURCE_SNAP_TOLERANCE_KM = env.float('SOURCE_SNAP_TOLERANCE_KM', default=15.0)
+
+# source_mode=interpolate (see utils/forecast_field.py): sources farther than
+# FORECAST_FIELD_MAX_KM from every district use the exact coordinate instead;
+# a worker rebuilds the field of a date from cached forecasts after FORECAST_FIELD_TTL seconds
+FORECAST_FIELD_MAX_KM = env.float('FORECAST_FIELD_MAX_KM', default=50.0)
+FORECAST_FIELD_TTL = env.int('FORECAST_FIELD_TTL', default=900)
+
+# Most queries accepted by one /api/core/travel-recommendation/batch/ call
+TRAVEL_BATCH_MAX_QUERIES = env.int('TRAVEL_BATCH_MAX_QUERIES', default=50)
+
+# Serve best-cities-to-visit and travel-recommendation with the async views in
+# core/async_views.py. Only useful under an ASGI server (e.g. uvicorn config.asgi:application).
+ASYNC_VIEWS = env.bool('ASYNC_VIEWS', default=False)
@@ -0,0 +1,149 @@
+"""
+Async versions of the core endpoints, used in place of the APIViews when
+ASYNC_VIEWS is on (see core/urls.py). Under an ASGI server a request waiting on
+Open-Meteo is a suspended coroutine instead of a blocked worker thread; blocking
+work that only happens occasionally (loading district data, rebuilding a stale
+snapshot, building a forecast field) is handed to a thread; the in-memory paths
+run on the event loop.
+"""
+import functools
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, MethodNotAllowed, NotAuthenticated
+
+from utils.openmateo_client import acompare_weather, acompare_weather_range
+from utils.district_data_loader import get_districts, districts_loaded
+from utils.district_registry import registry_for
+from utils.ranking_snapshot import get_snapshot, snapshot_is_current
+from utils.http_cache import conditional_response, with_validators
+from .authentication import AsyncJWTAuthentication
+from .renderers import FastJSONRenderer
+from .serializers import TopDistrictsQuerySerializer, TravelRecommendationRangeQuerySerializer
+from .views import (
+    _top_districts_validators, _is_default_ranking, _top_districts_data,
+    _resolve_source, _recommendation, _range_recommendation
+)
+
+
+_authentication = AsyncJWTAuthentication()
+_renderer = FastJSONRenderer()
+_ALLOWED_METHODS = ("GET", "HEAD")
+
+
+def _json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(_renderer.render(data), content_type=_renderer.media_type, status=status_code)
+
+
+def async_api_view(view):
+    """
+    Runs an async view the way APIView runs the sync ones: a JWT-authenticated
+    user is required, only GET/HEAD are allowed, and APIExceptions (validation,
+    authentication, method, upstream errors) are answered with DRF's status code
+    and error body. Like APIView.as_view(), the view is exempt from session CSRF.
+    """
+    @csrf_exempt
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            authenticated = await _authentication.aauthenticate(request)
+            if authenticated is None:
+                raise NotAuthenticated()
+            request.user, request.auth = authenticated
+            if request.method not in _ALLOWED_METHODS:
+                raise MethodNotAllowed(request.method)
+            return await view(request, *args, **kwargs)
+        except APIException as e:
+            detail = e.detail if isinstance(e.detail, (list, dict)) else {"detail": e.detail}
+            response = _json_response(detail, e.status_code)
+            if isinstance(e, (NotAuthenticated, AuthenticationFailed)):
+                response["WWW-Authenticate"] = _authentication.authenticate_header(request)
+            if isinstance(e, MethodNotAllowed):
+                response["Allow"] = ", ".join(_ALLOWED_METHODS)
+            return response
+    return wrapper
+
+
+async def _load_districts():
+    try:
+        if districts_loaded():
+            return get_districts(), None
+        return await sync_to_async(get_districts, thread_sensitive=False)(), None
+    except Exception as e:
+        return None, _json_response({
+            "success": False,
+            "message": "Unable to load district data.",
+            "details": str(e)
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_api_view
+async def top_districts(request):
+    serializer = TopDistrictsQuerySerializer(data=request.GET)
+    serializer.is_valid(raise_exception=True)
+    query = serializer.validated_data
+
+    districts, error = await _load_districts()
+    if error is not None:
+        return error
+
+    if snapshot_is_current():
+        snapshot = get_snapshot(registry_for(districts))
+    else:
+        snapshot = await sync_to_async(get_snapshot, thread_sensitive=False)(registry_for(districts))
+    validators = _top_districts_validators(snapshot, query, _renderer.media_type)
+    not_modified = conditional_response(request, *validators)
+    if not_modified is not None:
+        return not_modified
+
+    prerendered = _is_default_ranking(query)
+    body = snapshot.rendered.get(query["k"]) if prerendered else None
+    if body is None:
+        body = _renderer.render(_top_districts_data(snapshot, query))
+        if prerendered:
+            snapshot.rendered[query["k"]] = body
+    return with_validators(HttpResponse(body, content_type=_renderer.media_type), *validators)
+
+
+@async_api_view
+async def travel_recommendation(request):
+    serializer = TravelRecommendationRangeQuerySerializer(data=request.GET)
+    serializer.is_valid(raise_exception=True)
+    validated_data = serializer.validated_data
+
+    districts, error = await _load_districts()
+    if error is not None:
+        return error
+
+    registry = registry_for(districts)
+    destination = validated_data["destination"]
+    district_info = registry.get(destination)
+    if not district_info:
+        return _json_response({
+            "success": False,
+            "message": f"Destination '{destination}' not found in district list."
+        }, status.HTTP_400_BAD_REQUEST)
+
+    travel_date = validated_data["date"].strftime("%Y-%m-%d")
+    end_date = validated_data["end_date"].strftime("%Y-%m-%d") if validated_data.get("end_date") else None
+    if validated_data["source_mode"] == "interpolate":
+        # Building a forecast field may fetch the district forecasts
+        resolved = await sync_to_async(_resolve_source, thread_sensitive=False)(
+            registry, validated_data, travel_date, end_date
+        )
+    else:
+        resolved = _resolve_source(registry, validated_data, travel_date, end_date)
+    source, options, source_info = resolved
+
+    if end_date is None:
+        result = await acompare_weather(source=source, destination=district_info, date=travel_date, **options)
+        return _json_response(_recommendation(result, source_info))
+
+    result = await acompare_weather_range(source, district_info, travel_date, end_date, **options)
+    if result["best"] is None:
+        return _json_response({
+            "success": False,
+            "message": f"No forecast available between {travel_date} and {end_date}."
+        }, status.HTTP_400_BAD_REQUEST)
+    return _json_response(_range_recommendation(result, source_info))
@@ -0,0 +1,38 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from utils.openmateo_client import location_cache
+from utils.ranking_snapshot import refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the top-districts ranking snapshot, once or on a fixed interval'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=settings.RANKING_REFRESH_INTERVAL,
+            help='Seconds between refreshes'
+        )
+        parser.add_argument('--once', action='store_true', help='Refresh a single time and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                snapshot = refresh_snapshot(force=True)
+                self.stdout.write(self.style.SUCCESS(
+                    f"Ranking snapshot refreshed with {len(snapshot.records)} districts"
+                ))
+            except Exception as e:
+                # A single run reports failure through its exit status; the loop keeps going
+                if options['once']:
+                    raise CommandError(f"Error refreshing ranking snapshot: {e}")
+                self.stderr.write(f"Error refreshing ranking snapshot: {e}")
+
+            location_cache.purge_expired()
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,105 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from utils.timing import metrics, start_request, end_request, server_timing_header
+from utils.sampling_profiler import profiler, current_config, should_sample
+
+
+class ServerTimingMiddleware:
+    """
+    Collects the stage timers hit while handling a request, emits them as a
+    `Server-Timing` header and records the total per view in the metrics histograms.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        stages, token = start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, stages, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stages, token = start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, stages, started)
+
+    def _finish(self, request, response, stages, started):
+        elapsed = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        if match is not None:
+            metrics.observe("view", match.view_name, elapsed)
+
+        response["Server-Timing"] = server_timing_header(stages, elapsed * 1000)
+        return response
+
+
+class SamplingProfilerMiddleware:
+    """
+    Profiles 1-in-`sample_rate` requests from start to finish and the tail of any
+    request running longer than `latency_threshold_ms`. Costs a dict lookup per
+    request while the profiler is switched off.
+
+    Traces follow a thread. Under ASGI a sync view runs in a thread of its own,
+    which `process_view` (called in that same thread) starts tracing; async views
+    share the event loop thread with every other request and are not profiled.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        trace = self._begin()
+        try:
+            return self.get_response(request)
+        finally:
+            self._end(trace, request)
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            self._end(getattr(request, "_profiler_trace", None), request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if iscoroutinefunction(self) and not iscoroutinefunction(view_func):
+            request._profiler_trace = self._begin()
+
+    @staticmethod
+    def _begin():
+        config = current_config()
+        if not config["enabled"]:
+            return None
+        return profiler.begin(
+            always=should_sample(config["sample_rate"]),
+            threshold=config["latency_threshold_ms"] / 1000
+        )
+
+    @staticmethod
+    def _end(trace, request):
+        if trace is None:
+            return
+        match = getattr(request, "resolver_match", None)
+        profiler.end(trace, label=match.view_name if match else request.path)
@@ -0,0 +1,32 @@
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+from utils.timing import stage
+
+try:
+    import orjson
+except ImportError:  # optional; the standard json module is used without it
+    orjson = None
+
+
+_fallback_encoder = encoders.JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed. Output matches the
+    compact UTF-8 form of the stock renderer, except that NaN is written as null
+    instead of failing. Types orjson does not know (Decimal, lazy strings, ...)
+    go through DRF's encoder. Indented output is left to the stock renderer.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with stage("render"):
+            if (
+                orjson is None or data is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+            ):
+                return super().render(data, accepted_media_type, renderer_context)
+
+            rendered = orjson.dumps(data, default=_fallback_encoder.default, option=orjson.OPT_SERIALIZE_NUMPY)
+            # Same escaping as JSONRenderer, so the output stays a strict JavaScript subset
+            return rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -1,4 +1,5 @@
 from datetime import date, timedelta
+from django.conf import settings
 from rest_framework import serializers
 
 
@@ -11,6 +12,40 @@ class DistrictAirWeatherSerializer(serializers.Serializer):
     avg_pm2_5 = serializers.FloatField(help_text="Average PM2.5 air quality value")
     lat = serializers.CharField(help_text="Latitude of the district")
     long = serializers.CharField(help_text="Longitude of the district")
+    score = serializers.FloatField(required=False, help_text="Weighted score, lower is better (weighted rankings only)")
+
+
+class TopDistrictsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for top districts query params.
+    """
+    k = serializers.IntegerField(
+        required=False, default=10, min_value=1, max_value=64, help_text="Number of districts to return"
+    )
+    start_date = serializers.DateField(
+        format="%Y-%m-%d", input_formats=["%Y-%m-%d"], required=False,
+        help_text="First day averaged, in YYYY-MM-DD format"
+    )
+    end_date = serializers.DateField(
+        format="%Y-%m-%d", input_formats=["%Y-%m-%d"], required=False,
+        help_text="Last day averaged, in YYYY-MM-DD format"
+    )
+    temperature_weight = serializers.FloatField(
+        required=False, min_value=0, help_text="Weight of the standardized average temperature in the score"
+    )
+    pm2_5_weight = serializers.FloatField(
+        required=False, min_value=0, help_text="Weight of the standardized average PM2.5 in the score"
+    )
+
+    def validate(self, attrs):
+        if "start_date" in attrs and "end_date" in attrs and attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError({"end_date": "End date cannot be before the start date."})
+        if "temperature_weight" in attrs or "pm2_5_weight" in attrs:
+            weights = (attrs.get("temperature_weight", 0.0), attrs.get("pm2_5_weight", 0.0))
+            if not any(weights):
+                raise serializers.ValidationError("At least one weight must be positive.")
+            attrs["weights"] = weights
+        return attrs
 
 
 class TravelRecommendationQuerySerializer(serializers.Serializer):
@@ -25,6 +60,21 @@ class TravelRecommendationQuerySerializer(serializers.Serializer):
         input_formats=["%Y-%m-%d"],
         help_text="Travel date in YYYY-MM-DD format"
     )
+    source_mode = serializers.ChoiceField(
+        choices=["exact", "nearest", "interpolate"],
+        required=False,
+        default="exact",
+        help_text=(
+            "'nearest' compares from the closest district when it is within the snap tolerance; "
+            "'interpolate' estimates the source from the district forecasts"
+        )
+    )
+    snap_tolerance_km = serializers.FloatField(
+        required=False,
+        min_value=0,
+        max_value=100,
+        help_text="Maximum distance (km) to snap the source to a district"
+    )
 
     def validate_date(self, value):
         today = date.today()
@@ -32,4 +82,89 @@ class TravelRecommendationQuerySerializer(serializers.Serializer):
             raise serializers.ValidationError("Travel date cannot be in the past.")
         if value > (today + timedelta(days=15)):
             raise serializers.ValidationError("Travel date must be within 15 days from today.")
-        return value
\ No newline at end of file
+        return value
+
+
+class TravelRecommendationRangeQuerySerializer(TravelRecommendationQuerySerializer):
+    """
+    Serializer for travel recommendation query params with an optional date range.
+    """
+    end_date = serializers.DateField(
+        format="%Y-%m-%d",
+        input_formats=["%Y-%m-%d"],
+        required=False,
+        help_text="Last travel date in YYYY-MM-DD format; compares every day from `date` to it"
+    )
+
+    def validate_end_date(self, value):
+        if value > (date.today() + timedelta(days=15)):
+            raise serializers.ValidationError("End date must be within 15 days from today.")
+        return value
+
+    def validate(self, attrs):
+        if "end_date" in attrs and attrs["end_date"] < attrs["date"]:
+            raise serializers.ValidationError({"end_date": "End date cannot be before the travel date."})
+        return attrs
+
+
+class TravelRecommendationBatchSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of travel recommendation queries.
+    """
+    queries = TravelRecommendationQuerySerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.TRAVEL_BATCH_MAX_QUERIES,
+        help_text="Travel recommendation queries, answered in the same order"
+    )
+
+
+class DistrictSerializer(serializers.Serializer):
+    """
+    Serializer for a district from the district list.
+    """
+    name = serializers.CharField(help_text="Name of the district")
+    bn_name = serializers.CharField(required=False, help_text="Bangla name of the district")
+    lat = serializers.CharField(help_text="Latitude of the district")
+    long = serializers.CharField(help_text="Longitude of the district")
+
+
+class DistrictAutocompleteQuerySerializer(serializers.Serializer):
+    """
+    Serializer for district autocomplete query params.
+    """
+    q = serializers.CharField(help_text="Beginning of an English, Bangla or alternative district name")
+    limit = serializers.IntegerField(
+        required=False, default=10, min_value=1, max_value=64, help_text="Maximum number of suggestions"
+    )
+
+
+class NearestDistrictSerializer(DistrictSerializer):
+    """
+    Serializer for a district and its distance from the queried point.
+    """
+    distance_km = serializers.FloatField(help_text="Great-circle distance from the queried point")
+
+
+class NearestDistrictsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for nearest districts query params.
+    """
+    lat = serializers.FloatField(min_value=-90, max_value=90, help_text="Latitude of the point")
+    long = serializers.FloatField(min_value=-180, max_value=180, help_text="Longitude of the point")
+    k = serializers.IntegerField(
+        required=False, default=3, min_value=1, max_value=64, help_text="Number of districts to return"
+    )
+
+
+class ProfilerControlSerializer(serializers.Serializer):
+    """
+    Serializer for switching the sampling profiler at runtime.
+    """
+    enabled = serializers.BooleanField(required=False, help_text="Whether requests are profiled")
+    sample_rate = serializers.IntegerField(
+        required=False, min_value=0, help_text="Profile every Nth request (0 disables rate sampling)"
+    )
+    latency_threshold_ms = serializers.FloatField(
+        required=False, min_value=0, help_text="Also profile requests running longer than this"
+    )
@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class FakeVariable:
+    def __init__(self, values):
+        self._values = np.asarray(values, dtype=np.float32)
+
+    def ValuesAsNumpy(self):
+        return self._values
+
+
+class FakeHourly:
+    def __init__(self, start, values, interval=3600):
+        self._start = start
+        self._interval = interval
+        self._variable = FakeVariable(values)
+
+    def Time(self):
+        return self._start
+
+    def TimeEnd(self):
+        return self._start + len(self._variable.ValuesAsNumpy()) * self._interval
+
+    def Interval(self):
+        return self._interval
+
+    def Variables(self, index):
+        return self._variable
+
+
+class FakeResponse:
+    """
+    Minimal stand-in for an Open-Meteo `WeatherApiResponse` carrying one hourly variable.
+    """
+    def __init__(self, start, values, utc_offset=6 * 3600):
+        self._hourly = FakeHourly(start, values)
+        self._utc_offset = utc_offset
+
+    def Hourly(self):
+        return self._hourly
+
+    def UtcOffsetSeconds(self):
+        return self._utc_offset
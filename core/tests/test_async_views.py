@@ -0,0 +1,97 @@
+import json
+import time
+import pytest
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.async_views import top_districts, travel_recommendation
+from utils.ranking_snapshot import RankingSnapshot
+
+User = get_user_model()
+DISTRICTS = [{"name": "Dhaka", "lat": "23.8103", "long": "90.4125"}]
+
+
+@pytest.fixture
+def auth_header(db):
+    user = User.objects.create_user(username="testuser", password="testpass123")
+    return {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+
+def call(view, params, method="get", **headers):
+    return async_to_sync(view)(getattr(AsyncRequestFactory(), method)("/", params, headers=headers))
+
+
+@pytest.mark.django_db
+def test_async_views_require_authentication():
+    response = call(top_districts, {})
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"].startswith("Bearer")
+
+    response = call(travel_recommendation, {}, Authorization="Bearer not-a-token")
+    assert response.status_code == 401
+    assert json.loads(response.content)["code"] == "token_not_valid"
+
+
+def test_async_views_reject_other_methods(auth_header):
+    for view in (top_districts, travel_recommendation):
+        response = call(view, {}, method="post", **auth_header)
+        assert response.status_code == 405
+        assert response["Allow"] == "GET, HEAD"
+        assert json.loads(response.content)["detail"] == 'Method "POST" not allowed.'
+
+
+@patch("core.async_views.get_districts", return_value=DISTRICTS)
+@patch("core.async_views.get_snapshot", return_value=RankingSnapshot(records=[], built_at=time.time()))
+@patch("core.views.get_top_districts")
+def test_async_top_districts(mock_top_districts, mock_snapshot, mock_get_districts, auth_header):
+    mock_top_districts.return_value = [
+        {"district_name": "Dhaka", "avg_temperature_2pm": 28.0, "avg_pm2_5": 40.0, "lat": "23.8103", "long": "90.4125"}
+    ]
+
+    response = call(top_districts, {}, **auth_header)
+    assert response.status_code == 200
+    assert json.loads(response.content)[0]["district_name"] == "Dhaka"
+
+    not_modified = call(top_districts, {}, **{"If-None-Match": response["ETag"]}, **auth_header)
+    assert not_modified.status_code == 304
+
+    invalid = call(top_districts, {"k": 0}, **auth_header)
+    assert invalid.status_code == 400 and "k" in json.loads(invalid.content)
+
+
+@patch("core.async_views.districts_loaded", return_value=True)
+@patch("core.async_views.snapshot_is_current", return_value=True)
+@patch("core.async_views.get_districts", return_value=DISTRICTS)
+@patch("core.async_views.get_snapshot", return_value=RankingSnapshot(records=[], built_at=time.time()))
+@patch("core.async_views.sync_to_async", side_effect=AssertionError("unexpected thread hop"))
+@patch("core.views.get_top_districts", return_value=[])
+def test_async_top_districts_serves_memory_on_the_event_loop(
+    mock_top_districts, mock_sync_to_async, mock_snapshot, mock_get_districts, mock_current, mock_loaded, auth_header
+):
+    response = call(top_districts, {}, **auth_header)
+    assert response.status_code == 200
+    mock_sync_to_async.assert_not_called()
+
+
+@patch("core.async_views.get_districts", return_value=DISTRICTS)
+@patch("core.async_views.acompare_weather")
+@patch("core.views.generate_weather_message", return_value="Cool and clean air in Dhaka.")
+def test_async_travel_recommendation(mock_message, mock_compare, mock_get_districts, auth_header):
+    mock_compare.return_value = {"temp_diff": -2, "air_con_diff": -5}
+
+    travel_date = (date.today() + timedelta(days=3)).isoformat()
+    response = call(travel_recommendation, {
+        "destination": "Dhaka", "lat": 22.3569, "long": 91.7832, "date": travel_date
+    }, **auth_header)
+
+    assert response.status_code == 200
+    data = json.loads(response.content)
+    assert data["recommendation"] == "Recommended"
+    assert mock_compare.call_args.kwargs["date"] == travel_date
+
+    missing = call(travel_recommendation, {"destination": "Nowhere", "lat": 22.3, "long": 91.7, "date": travel_date}, **auth_header)
+    assert missing.status_code == 400
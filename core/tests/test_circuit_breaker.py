@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+async def _fail():
+    raise ConnectionError("upstream down")
+
+
+async def _succeed():
+    return "ok"
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            asyncio.run(breaker.call(_fail))
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.call(_succeed))
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(_fail))
+    assert asyncio.run(breaker.call(_succeed)) == "ok"
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(_fail))
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_probe_after_reset_timeout_closes_or_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(_fail))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Failed probe re-opens immediately
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(_fail))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert asyncio.run(breaker.call(_succeed)) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_ignored_errors_do_not_count():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(_fail, is_failure=lambda e: False))
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import pytest
+import requests
+from unittest.mock import patch, Mock
+from rest_framework.exceptions import APIException
+
+from utils import district_data_loader
+from utils.district_data_loader import fetch_district_data, get_districts
+from utils.shared_files import write_atomic, PollInterval
+
+
+DATA = {"districts": [{"name": "Dhaka", "lat": "23.8103", "long": "90.4125"}]}
+
+
+@pytest.fixture(autouse=True)
+def district_settings(settings, tmp_path, monkeypatch):
+    settings.DISTRICT_DATA_URL = "https://example.com/districts.json"
+    settings.DISTRICT_DATA_PATH = str(tmp_path / "data.json")
+    settings.DISTRICT_FETCH_BACKOFF = 0
+    settings.DISTRICT_RETRY_AFTER = 30
+    for name, value in (("_districts", None), ("_districts_error", None), ("_districts_mtime", None), ("_disk_poll", PollInterval())):
+        monkeypatch.setattr(district_data_loader, name, value)
+    return settings
+
+
+def _ok(data=DATA, headers=None):
+    return Mock(status_code=200, json=Mock(return_value=data), raise_for_status=Mock(), headers=headers or {})
+
+
+@patch("utils.district_data_loader.requests.get")
+def test_fetch_retries_and_writes_file(mock_get, district_settings):
+    mock_get.side_effect = [requests.ConnectionError("reset"), requests.Timeout("slow"), _ok()]
+
+    assert fetch_district_data() == DATA
+    assert mock_get.call_count == 3
+    with open(district_settings.DISTRICT_DATA_PATH) as f:
+        assert json.load(f) == DATA
+
+
+@patch("utils.district_data_loader.requests.get", side_effect=requests.ConnectionError("down"))
+def test_fetch_gives_up_after_retries(mock_get, district_settings):
+    district_settings.DISTRICT_FETCH_RETRIES = 2
+    with pytest.raises(RuntimeError, match="after 3 attempts"):
+        fetch_district_data()
+
+
+@patch("utils.district_data_loader.requests.get")
+def test_missing_file_is_fetched_in_process(mock_get):
+    mock_get.return_value = _ok()
+    assert get_districts() == DATA["districts"]
+    assert get_districts() == DATA["districts"]
+    assert mock_get.call_count == 1
+
+
+@patch("utils.district_data_loader.requests.get")
+def test_failure_is_retried_after_backoff_window(mock_get, district_settings, monkeypatch):
+    district_settings.DISTRICT_FETCH_RETRIES = 0
+    mock_get.side_effect = requests.ConnectionError("down")
+    clock = [1000.0]
+    monkeypatch.setattr(district_data_loader.time, "monotonic", lambda: clock[0])
+
+    with pytest.raises(APIException):
+        get_districts()
+    with pytest.raises(APIException):
+        get_districts()
+    assert mock_get.call_count == 1
+
+    clock[0] += 31
+    mock_get.side_effect = None
+    mock_get.return_value = _ok()
+    assert get_districts() == DATA["districts"]
+
+
+def test_invalid_file_reports_error(district_settings):
+    with open(district_settings.DISTRICT_DATA_PATH, "w") as f:
+        f.write("{not json")
+    with pytest.raises(APIException, match="Invalid JSON"):
+        get_districts()
+
+
+@patch("utils.district_data_loader.requests.get")
+def test_conditional_get_keeps_file_when_unchanged(mock_get, district_settings):
+    mock_get.return_value = _ok(headers={"ETag": '"v1"', "Last-Modified": "Sat, 18 Oct 2025 00:00:00 GMT"})
+    fetch_district_data()
+    with open(district_settings.DISTRICT_DATA_PATH) as f:
+        content = f.read()
+    assert "\n" not in content and ", " not in content
+
+    mock_get.return_value = Mock(status_code=304, headers={})
+    assert fetch_district_data() is None
+
+    headers = mock_get.call_args.kwargs["headers"]
+    assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": "Sat, 18 Oct 2025 00:00:00 GMT"}
+    with open(district_settings.DISTRICT_DATA_PATH) as f:
+        assert f.read() == content
+
+
+def test_replaced_file_is_picked_up_without_restart(district_settings, monkeypatch):
+    monkeypatch.setattr(district_data_loader, "_disk_poll", PollInterval(seconds=0))
+    path = district_settings.DISTRICT_DATA_PATH
+    with open(path, "w") as f:
+        json.dump(DATA, f)
+    assert [d["name"] for d in get_districts()] == ["Dhaka"]
+
+    updated = {"districts": DATA["districts"] + [{"name": "Sylhet", "lat": "24.8949", "long": "91.8687"}]}
+    write_atomic(path, json.dumps(updated))
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    assert [d["name"] for d in get_districts()] == ["Dhaka", "Sylhet"]
+
+    # A broken replacement keeps the last good list
+    write_atomic(path, "{broken")
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    assert [d["name"] for d in get_districts()] == ["Dhaka", "Sylhet"]
+
+
+@patch("utils.district_data_loader.threading.Thread")
+def test_warm_up_only_runs_when_enabled(mock_thread, district_settings):
+    district_settings.DISTRICT_WARMUP = False
+    district_data_loader.warm_up()
+    mock_thread.assert_not_called()
+
+    district_settings.DISTRICT_WARMUP = True
+    district_data_loader.warm_up()
+    mock_thread.return_value.start.assert_called_once()
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from utils.district_registry import DistrictRegistry, normalize_name, registry_for
+
+
+DISTRICTS = [
+    {"id": "1", "name": "Comilla", "bn_name": "কুমিল্লা", "lat": "23.4682747", "long": "91.1788135"},
+    {"id": "2", "name": "Cox's Bazar", "bn_name": "কক্স বাজার", "lat": "21.4272", "long": "92.0058"},
+    {"id": "3", "name": "Chattogram", "bn_name": "চট্টগ্রাম", "lat": "22.335109", "long": "91.834073"},
+    {"id": "4", "name": "Chandpur", "bn_name": "চাঁদপুর", "lat": "23.2332585", "long": "90.6712912"},
+    {"id": "5", "name": "Dhaka", "bn_name": "ঢাকা", "lat": "23.7115253", "long": "90.4111451", "aliases": ["Dacca"]},
+]
+
+
+@pytest.fixture
+def registry():
+    return DistrictRegistry(DISTRICTS)
+
+
+def test_normalize_name():
+    assert normalize_name("  Cox's  Bazar ") == "coxsbazar"
+    assert normalize_name("ＤＨＡＫＡ") == "dhaka"
+    assert normalize_name("চাঁদপুর") == "চাঁদপুর"
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("dhaka", "Dhaka"),
+    ("DHAKA ", "Dhaka"),
+    ("ঢাকা", "Dhaka"),
+    ("Dacca", "Dhaka"),
+    ("coxs bazar", "Cox's Bazar"),
+    ("Cumilla", "Comilla"),
+    ("Chittagong", "Chattogram"),
+])
+def test_lookup_by_any_name(registry, name, expected):
+    assert registry.get(name)["name"] == expected
+
+
+def test_unknown_name(registry):
+    assert registry.get("Atlantis") is None
+    assert registry.get("Barisal") is None  # alias of a district not in this list
+
+
+def test_complete_in_name_order(registry):
+    assert [d["name"] for d in registry.complete("ch")] == ["Chandpur", "Chattogram"]
+    assert [d["name"] for d in registry.complete("c", limit=2)] == ["Chandpur", "Chattogram"]
+    assert [d["name"] for d in registry.complete("চ")] == ["Chandpur", "Chattogram"]
+    assert registry.complete("") == []
+
+
+def test_prebuilt_coordinates(registry):
+    assert registry.latitudes[0] == "23.4682747"
+    assert registry.long_array.dtype.kind == "f"
+    assert len(registry) == 5 and registry[4]["name"] == "Dhaka"
+
+
+def test_registry_is_built_once_per_list():
+    assert registry_for(DISTRICTS) is registry_for(DISTRICTS)
+    assert registry_for(list(DISTRICTS)) is not registry_for(DISTRICTS)
+
+
+def test_invalid_district_is_rejected():
+    with pytest.raises(ValueError):
+        DistrictRegistry([{"name": "Dhaka"}])
+
+
+@pytest.mark.django_db
+@patch("core.views.get_districts", return_value=DISTRICTS)
+def test_autocomplete_endpoint(mock_get_districts):
+    api = APIClient()
+    assert api.get("/api/core/districts/autocomplete/", {"q": "ch"}).status_code == 401
+
+    api.force_authenticate(get_user_model().objects.create_user(username="u", password="pass12345"))
+    response = api.get("/api/core/districts/autocomplete/", {"q": "Ch", "limit": 1})
+    assert response.status_code == 200
+    assert response.data == [{"name": "Chandpur", "bn_name": "চাঁদপুর", "lat": "23.2332585", "long": "90.6712912"}]
+
+    assert api.get("/api/core/districts/autocomplete/").status_code == 400
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from aiohttp import web
+
+from benchmarks.fake_openmeteo import FakeOpenMeteo
+from utils import openmateo_client
+from utils.forecast_cache import LocationForecastCache
+from utils.openmateo_client import AsyncOpenMeteoClient, DeadlineExceeded
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(openmateo_client, "location_cache", LocationForecastCache({}, expire_after=60))
+
+
+async def _fetch(fake, path, params):
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    client = AsyncOpenMeteoClient()
+    try:
+        return await client.weather_api(f"http://127.0.0.1:{port}{path}", params)
+    finally:
+        await client._session.close()
+        await runner.cleanup()
+
+
+def test_fake_upstream_serves_decodable_multi_location_flatbuffers():
+    fake = FakeOpenMeteo()
+    params = {
+        "latitude": [23.8103, 24.8949, 22.3569],
+        "longitude": [90.4125, 91.8687, 91.7832],
+        "hourly": "temperature_2m",
+        "timezone": "Asia/Dhaka",
+        "start_hour": "2025-10-18T13:00",
+        "end_hour": "2025-10-20T20:00",
+    }
+
+    responses = asyncio.run(_fetch(fake, "/v1/forecast", params))
+
+    assert len(responses) == 3
+    assert fake.requests == 1
+    for response, lat in zip(responses, params["latitude"]):
+        hourly = response.Hourly()
+        assert response.Latitude() == pytest.approx(lat, abs=1e-4)
+        assert response.UtcOffsetSeconds() == 6 * 3600
+        # 2025-10-18 13:00 in Dhaka is 07:00 UTC
+        assert hourly.Time() == 1760770800
+        assert len(hourly.Variables(0).ValuesAsNumpy()) == 2 * 24 + 8
+
+
+def test_fake_upstream_injects_errors(settings):
+    settings.OPENMETEO_REQUEST_DEADLINE = 0.5
+    fake = FakeOpenMeteo(error_rate=1.0)
+    params = {"latitude": [23.8], "longitude": [90.4], "hourly": "pm2_5", "forecast_days": 1}
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(_fetch(fake, "/v1/air-quality", params))
+    assert fake.requests > 1
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from benchmarks.fake_openmeteo import synthetic_districts
+from utils import forecast_field
+from utils.forecast_field import ForecastField
+from utils.district_registry import DistrictRegistry
+
+
+def _smooth_field(lats, longs):
+    # Temperature falls towards the north, PM2.5 rises towards the east
+    return np.column_stack((33.0 - (lats - 20.8) * 1.2, 40.0 + (longs - 88.1) * 12.0))
+
+
+@pytest.fixture
+def field():
+    registry = DistrictRegistry(synthetic_districts())
+    values = _smooth_field(registry.lat_array, registry.long_array)
+    return ForecastField(registry.lat_array, registry.long_array, values, max_km=50)
+
+
+def test_district_points_are_exact(field):
+    estimates = field.estimate_many(field.lats, field.longs)
+    np.testing.assert_allclose(estimates, field.values)
+
+
+def test_estimate_within_error_bound(field):
+    rng = np.random.default_rng(3)
+    nearest = rng.choice(len(field.lats), 200)
+    lats = field.lats[nearest] + rng.uniform(-0.2, 0.2, 200)
+    longs = field.longs[nearest] + rng.uniform(-0.2, 0.2, 200)
+
+    estimates = field.estimate_many(lats, longs)
+    errors = np.abs(estimates - _smooth_field(lats, longs))
+
+    for i, name in enumerate(forecast_field.VARIABLES):
+        assert field.error_bound[name] > 0
+        assert np.percentile(errors[:, i], 95) <= 2 * field.error_bound[name]
+
+
+def test_points_outside_coverage_are_not_estimated(field):
+    assert field.estimate(10.0, 80.0) is None
+    temperature, pm2_5 = field.estimate(23.8, 90.4)
+    assert 25 < temperature < 35 and 40 < pm2_5 < 100
+
+
+def test_missing_district_values_are_skipped():
+    lats, longs = np.linspace(21, 26, 10), np.linspace(88.5, 92, 10)
+    values = _smooth_field(lats, longs)
+    values[2] = np.nan
+
+    field = ForecastField(lats, longs, values, max_km=500)
+    assert len(field.values) == 9
+    assert not np.isnan(field.estimate(lats[2], longs[2])).any()
+
+
+def test_field_is_reused_until_ttl(settings, monkeypatch):
+    settings.FORECAST_FIELD_TTL = 60
+    monkeypatch.setattr(forecast_field, "_fields", {})
+    registry = DistrictRegistry(synthetic_districts())
+    calls = []
+
+    def fake_values(districts, date):
+        calls.append(date)
+        return _smooth_field(registry.lat_array, registry.long_array).T
+
+    monkeypatch.setattr(forecast_field, "get_district_values_at", fake_values)
+
+    first = forecast_field.get_field(registry, "2025-10-19")
+    assert forecast_field.get_field(registry, "2025-10-19") is first
+    forecast_field.get_field(registry, "2025-10-20")
+    assert calls == ["2025-10-19", "2025-10-20"]
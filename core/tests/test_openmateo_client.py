@@ -0,0 +1,523 @@
+import time
+import asyncio
+import concurrent.futures
+import datetime
+import pytest
+import aiohttp
+import numpy as np
+from aiohttp import web
+from django.conf import settings
+
+from utils import openmateo_client
+from utils.circuit_breaker import CircuitOpenError
+from utils.forecast_cache import LocationForecastCache, split_payload
+from utils.openmateo_client import (
+    AsyncOpenMeteoClient, DeadlineExceeded, WEATHER_URL, AIR_URL,
+    _process_hourly_response, _two_pm_values,
+    compare_weather, compare_weather_range, weather_api, weather_api_many
+)
+from utils.ranking_engine import RankingEngine
+from .fakes import FakeResponse
+
+
+# 2025-10-18 00:00 in Asia/Dhaka, expressed in UTC seconds
+LOCAL_MIDNIGHT = 1760724000
+
+DISTRICTS = [
+    {"name": "Dhaka", "lat": "23.8103", "long": "90.4125"},
+    {"name": "Sylhet", "lat": "24.8949", "long": "91.8687"},
+    {"name": "Khulna", "lat": "22.8456", "long": "89.5403"},
+]
+
+
+def _responses(hours=168):
+    rng = np.random.default_rng(0)
+    return [FakeResponse(LOCAL_MIDNIGHT, rng.uniform(10, 40, hours)) for _ in DISTRICTS]
+
+
+# Reference implementation the vectorized path has to reproduce
+def _process_hourly_response_with_frames(response, districts, param_key):
+    pd = pytest.importorskip("pandas")
+    data_list = []
+    for i, res in enumerate(response):
+        district = districts[i]
+        hourly = res.Hourly()
+        times = pd.date_range(
+            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
+            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=hourly.Interval()),
+            inclusive="left"
+        )
+        df = pd.DataFrame({
+            "date": times,
+            param_key: hourly.Variables(0).ValuesAsNumpy(),
+            "district_name": district["name"],
+            "lat": district["lat"],
+            "long": district["long"]
+        })
+        data_list.append(df[df["date"].dt.time == datetime.time(14, 0)])
+    return pd.concat(data_list, ignore_index=True)
+
+
+def test_process_hourly_response_matches_per_district_frames():
+    from pandas.testing import assert_frame_equal
+    response = _responses()
+    expected = _process_hourly_response_with_frames(response, DISTRICTS, "temperature_2m")
+    result = _process_hourly_response(response, DISTRICTS, "temperature_2m")
+
+    assert len(result) == 7 * len(DISTRICTS)
+    assert_frame_equal(result, expected)
+
+
+def test_process_hourly_response_partial_day():
+    from pandas.testing import assert_frame_equal
+    response = _responses(hours=30)
+    expected = _process_hourly_response_with_frames(response, DISTRICTS, "pm2_5")
+    assert_frame_equal(_process_hourly_response(response, DISTRICTS, "pm2_5"), expected)
+
+
+# The merge/groupby/sort pipeline the NumPy ranking replaced
+def _rank_districts_with_frames(districts, weather_response, air_response, result_range):
+    pd = pytest.importorskip("pandas")
+    weather_df = _process_hourly_response(weather_response, districts, param_key="temperature_2m")
+    air_df = _process_hourly_response(air_response, districts, param_key="pm2_5")
+    combined_df = pd.merge(weather_df, air_df, on=["district_name", "date"], suffixes=("_weather", "_air"))
+    avg_df = combined_df.groupby("district_name").agg({
+        "temperature_2m": "mean", "pm2_5": "mean", "lat_weather": "first", "long_weather": "first"
+    }).rename(columns={
+        "temperature_2m": "avg_temperature_2pm", "pm2_5": "avg_pm2_5", "lat_weather": "lat", "long_weather": "long"
+    }).reset_index()
+    return avg_df.sort_values(
+        by=["avg_temperature_2pm", "avg_pm2_5"], ascending=[True, True]
+    ).head(result_range).to_dict(orient="records")
+
+
+def test_ranking_engine_matches_pandas_pipeline():
+    rng = np.random.default_rng(1)
+    districts = [
+        {"name": f"District {i:02d}", "lat": f"{20 + i / 10:.4f}", "long": f"{88 + i / 10:.4f}"}
+        for i in rng.permutation(64)
+    ]
+    # Rounded values produce ties on temperature, broken by PM2.5 and then by name
+    temperatures = np.round(rng.uniform(20, 24, (64, 168)))
+    pm2_5 = np.round(rng.uniform(10, 14, (64, 168)))
+    temperatures[3, :] = np.nan
+    pm2_5[5, 14::24] = np.nan
+    weather = [FakeResponse(LOCAL_MIDNIGHT, row) for row in temperatures]
+    air = [FakeResponse(LOCAL_MIDNIGHT, row) for row in pm2_5]
+
+    expected = _rank_districts_with_frames(districts, weather, air, result_range=64)
+    result = RankingEngine.from_forecasts(districts, _two_pm_values(weather), _two_pm_values(air)).rank(64)
+
+    assert [r["district_name"] for r in result] == [r["district_name"] for r in expected]
+    for got, want in zip(result, expected):
+        assert got.keys() == want.keys()
+        assert got["lat"] == want["lat"] and got["long"] == want["long"]
+        np.testing.assert_allclose(
+            [got["avg_temperature_2pm"], got["avg_pm2_5"]],
+            [want["avg_temperature_2pm"], want["avg_pm2_5"]],
+            rtol=1e-6
+        )
+
+
+def test_ranking_engine_only_averages_shared_days():
+    weather = (np.array([0, 86400, 172800]), np.array([[10.0, 20.0, 30.0]]))
+    air = (np.array([86400, 172800, 259200]), np.array([[1.0, 2.0, 3.0]]))
+    [record] = RankingEngine.from_forecasts(DISTRICTS[:1], weather, air).rank(10)
+    assert record["avg_temperature_2pm"] == 25.0
+    assert record["avg_pm2_5"] == 1.5
+
+    assert RankingEngine.from_forecasts(DISTRICTS[:1], weather, (np.array([5]), np.array([[1.0]]))).rank(10) == []
+
+
+def _message(body):
+    return len(body).to_bytes(4, byteorder="little") + body
+
+
+@pytest.fixture
+def fake_download(monkeypatch):
+    calls = []
+
+    async def download(self, url, params, deadline):
+        calls.append((url, params))
+        await asyncio.sleep(0.2)
+        locations = zip(params["latitude"].split(","), params["longitude"].split(","))
+        return b"".join(_message(f"{url}|{lat},{long}".encode()) for lat, long in locations)
+
+    monkeypatch.setattr(openmateo_client, "location_cache", LocationForecastCache({}, expire_after=60))
+    monkeypatch.setattr(AsyncOpenMeteoClient, "_download", download)
+    monkeypatch.setattr(AsyncOpenMeteoClient, "_decode", staticmethod(lambda payload: payload[4:].decode()))
+    return calls
+
+
+def test_weather_and_air_are_fetched_concurrently(fake_download):
+    params = {"latitude": [23.8, 24.9], "longitude": [90.4, 91.9], "hourly": "temperature_2m"}
+
+    started = time.monotonic()
+    weather, air = weather_api_many((WEATHER_URL, params), (AIR_URL, params))
+
+    assert time.monotonic() - started < 0.35
+    assert weather == [f"{WEATHER_URL}|23.8,90.4", f"{WEATHER_URL}|24.9,91.9"]
+    assert air == [f"{AIR_URL}|23.8,90.4", f"{AIR_URL}|24.9,91.9"]
+    assert fake_download[0][1]["latitude"] == "23.8,24.9"
+    assert fake_download[0][1]["format"] == "flatbuffers"
+
+
+def test_payloads_are_cached(fake_download):
+    params = {"latitude": [23.8], "longitude": [90.4], "hourly": "pm2_5"}
+    weather_api(AIR_URL, params)
+    weather_api(AIR_URL, params)
+    assert len(fake_download) == 1
+
+
+def test_only_missing_locations_are_requested(fake_download):
+    window = {"hourly": "temperature_2m", "timezone": "Asia/Dhaka"}
+    weather_api(WEATHER_URL, {**window, "latitude": ["23.8103", "24.8949"], "longitude": ["90.4125", "91.8687"]})
+
+    result = weather_api(WEATHER_URL, {**window, "latitude": [22.3569, 24.8949], "longitude": [91.7832, 91.8687]})
+
+    assert result == [f"{WEATHER_URL}|22.3569,91.7832", f"{WEATHER_URL}|24.8949,91.8687"]
+    assert len(fake_download) == 2
+    assert fake_download[1][1]["latitude"] == "22.3569"
+
+
+def test_cache_entries_are_separated_by_window(fake_download):
+    params = {"latitude": [23.8], "longitude": [90.4], "hourly": "temperature_2m"}
+    weather_api(WEATHER_URL, {**params, "start_date": "2025-10-18", "end_date": "2025-10-18"})
+    weather_api(WEATHER_URL, {**params, "start_date": "2025-10-19", "end_date": "2025-10-19"})
+    assert len(fake_download) == 2
+
+
+def test_split_payload():
+    data = _message(b"first") + _message(b"second!")
+    assert split_payload(data) == [_message(b"first"), _message(b"second!")]
+
+
+def test_identical_concurrent_fetches_share_one_upstream_call(fake_download):
+    params = {"latitude": [23.8, 24.9], "longitude": [90.4, 91.9], "hourly": "temperature_2m"}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: weather_api(WEATHER_URL, params), range(8)))
+
+    assert len(fake_download) == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_compare_weather_reads_destination_from_district_forecast(monkeypatch):
+    requests = []
+    comparison_hour = LOCAL_MIDNIGHT + (24 + 13) * 3600
+
+    def fake_many(*reqs):
+        requests.append(reqs)
+        return [
+            [FakeResponse(LOCAL_MIDNIGHT, np.arange(168))],
+            [FakeResponse(LOCAL_MIDNIGHT, np.arange(168) + 100)],
+            [FakeResponse(comparison_hour, [30.0])],
+            [FakeResponse(comparison_hour, [120.0])],
+        ]
+
+    monkeypatch.setattr(openmateo_client, "weather_api_many", fake_many)
+    result = compare_weather(
+        source={"lat": 22.3569, "long": 91.7832},
+        destination=DISTRICTS[0],
+        date="2025-10-19"
+    )
+
+    # Day 1 at 13:00 local is hour 37 of the district window
+    assert result == {"temp_diff": 37.0 - 30.0, "air_con_diff": 137.0 - 120.0}
+    assert len(requests) == 1
+    assert requests[0][0][1]["end_hour"].endswith("T20:00")
+    assert requests[0][2][1]["latitude"] == [22.3569]
+    assert requests[0][2][1]["start_hour"] == requests[0][2][1]["end_hour"] == "2025-10-19T13:00"
+
+
+def test_compare_weather_falls_back_outside_district_window(monkeypatch):
+    requests = []
+    comparison_hour = LOCAL_MIDNIGHT + (10 * 24 + 13) * 3600
+
+    def fake_many(*reqs):
+        requests.append(reqs)
+        if len(reqs) == 4:
+            return [
+                [FakeResponse(LOCAL_MIDNIGHT, np.arange(168))],
+                [FakeResponse(LOCAL_MIDNIGHT, np.arange(168))],
+                [FakeResponse(comparison_hour, [30.0])],
+                [FakeResponse(comparison_hour, [50.0])],
+            ]
+        return [[FakeResponse(comparison_hour, [25.0])], [FakeResponse(comparison_hour, [40.0])]]
+
+    monkeypatch.setattr(openmateo_client, "weather_api_many", fake_many)
+    result = compare_weather(
+        source={"lat": 22.3569, "long": 91.7832},
+        destination=DISTRICTS[0],
+        date="2025-10-28"
+    )
+
+    assert result == {"temp_diff": -5.0, "air_con_diff": -10.0}
+    assert len(requests) == 2
+    assert requests[1][0][1]["start_hour"] == "2025-10-28T13:00"
+
+
+def test_compare_weather_reads_snapped_source_from_district_forecast(monkeypatch):
+    requests = []
+
+    def fake_many(*reqs):
+        requests.append(reqs)
+        return [
+            [FakeResponse(LOCAL_MIDNIGHT, np.arange(168)), FakeResponse(LOCAL_MIDNIGHT, np.arange(168) + 2)],
+            [FakeResponse(LOCAL_MIDNIGHT, np.arange(168) + 100), FakeResponse(LOCAL_MIDNIGHT, np.arange(168) + 110)],
+        ]
+
+    monkeypatch.setattr(openmateo_client, "weather_api_many", fake_many)
+    result = compare_weather(
+        source=DISTRICTS[1],
+        destination=DISTRICTS[0],
+        date="2025-10-19",
+        source_is_district=True
+    )
+
+    assert result == {"temp_diff": -2.0, "air_con_diff": -10.0}
+    # Both districts share one district-wide request pair
+    assert len(requests) == 1 and len(requests[0]) == 2
+    assert requests[0][0][1]["latitude"] == [DISTRICTS[0]["lat"], DISTRICTS[1]["lat"]]
+    assert all(params["end_hour"].endswith("T20:00") for _, params in requests[0])
+
+
+def test_compare_weather_with_known_source_values(monkeypatch):
+    requests = []
+
+    def fake_many(*reqs):
+        requests.append(reqs)
+        return [[FakeResponse(LOCAL_MIDNIGHT, np.arange(168))], [FakeResponse(LOCAL_MIDNIGHT, np.arange(168) + 100)]]
+
+    monkeypatch.setattr(openmateo_client, "weather_api_many", fake_many)
+    result = compare_weather(
+        source={"lat": 23.1, "long": 91.0},
+        destination=DISTRICTS[0],
+        date="2025-10-19",
+        source_values=(30.0, 120.0)
+    )
+
+    assert result == {"temp_diff": 7.0, "air_con_diff": 17.0}
+    assert len(requests) == 1 and len(requests[0]) == 2
+
+
+def test_compare_weather_many_groups_requests_by_date(monkeypatch):
+    requests = []
+
+    def fake_many(*reqs):
+        requests.append(reqs)
+        responses = []
+        for _, params in reqs:
+            if "T20:00" in params["end_hour"]:
+                responses.append([FakeResponse(LOCAL_MIDNIGHT, np.arange(168)) for _ in params["latitude"]])
+            else:
+                start = LOCAL_MIDNIGHT + (datetime.date.fromisoformat(params["start_hour"][:10]).day - 18) * 86400 + 13 * 3600
+                responses.append([FakeResponse(start, [float(lat)]) for lat in params["latitude"]])
+        return responses
+
+    monkeypatch.setattr(openmateo_client, "weather_api_many", fake_many)
+    source_a, source_b = {"lat": 22.0, "long": 91.0}, {"lat": 23.0, "long": 90.0}
+    comparisons = [
+        {"source": source_a, "destination": DISTRICTS[0], "date": "2025-10-19"},
+        {"source": source_b, "destination": DISTRICTS[1], "date": "2025-10-19"},
+        {"source": source_a, "destination": DISTRICTS[1], "date": "2025-10-20"},
+        {"source": source_a, "destination": DISTRICTS[0], "date": "2025-10-19"},
+        {"source": source_a, "destination": DISTRICTS[2], "date": "2025-10-30"},
+    ]
+
+    results = openmateo_client.compare_weather_many(comparisons)
+
+    # District pair + one pair per date of sources, then one fallback pair for the date outside the window
+    assert [len(r) for r in requests] == [8, 2]
+    assert requests[0][0][1]["latitude"] == [d["lat"] for d in DISTRICTS]
+    assert requests[0][2][1]["latitude"] == [22.0, 23.0]
+    assert requests[0][4][1]["latitude"] == [22.0]
+    assert requests[1][0][1]["latitude"] == [DISTRICTS[2]["lat"]]
+
+    # Day 1 13:00 is hour 37 of the district window, day 2 hour 61
+    assert results[0] == {"temp_diff": 37.0 - 22.0, "air_con_diff": 37.0 - 22.0}
+    assert results[1] == {"temp_diff": 37.0 - 23.0, "air_con_diff": 37.0 - 23.0}
+    assert results[2] == {"temp_diff": 61.0 - 22.0, "air_con_diff": 61.0 - 22.0}
+    assert results[3] == results[0]
+    assert results[4] == pytest.approx({"temp_diff": 22.8456 - 22.0, "air_con_diff": 22.8456 - 22.0}, abs=1e-5)
+
+
+def test_compare_weather_range_reads_each_day_from_one_call(monkeypatch):
+    requests = []
+    range_start = LOCAL_MIDNIGHT + (24 + 13) * 3600
+
+    def fake_many(*reqs):
+        requests.append(reqs)
+        return [
+            [FakeResponse(LOCAL_MIDNIGHT, np.arange(168))],
+            [FakeResponse(LOCAL_MIDNIGHT, np.arange(168) + 100)],
+            # Source range 10-19 13:00 .. 10-21 13:00, cooler than the destination on 10-20 only
+            [FakeResponse(range_start, np.r_[30.0, np.zeros(23), 70.0, np.zeros(23), 90.0])],
+            [FakeResponse(range_start, np.r_[120.0, np.zeros(23), 170.0, np.zeros(23), 100.0])],
+        ]
+
+    monkeypatch.setattr(openmateo_client, "weather_api_many", fake_many)
+    monkeypatch.setattr(openmateo_client, "_local_today", lambda: datetime.date(2025, 10, 18))
+    result = compare_weather_range(
+        source={"lat": 22.3569, "long": 91.7832},
+        destination=DISTRICTS[0],
+        start_date="2025-10-19",
+        end_date="2025-10-21"
+    )
+
+    assert len(requests) == 1 and len(requests[0]) == 4
+    assert requests[0][0][1]["end_hour"].endswith("T20:00")
+    assert requests[0][2][1]["start_hour"] == "2025-10-19T13:00"
+    assert requests[0][2][1]["end_hour"] == "2025-10-21T13:00"
+    assert result["dates"] == ["2025-10-19", "2025-10-20", "2025-10-21"]
+    # 13:00 of days 1-3 are hours 37, 61 and 85 of the district window
+    assert result["temp_diff"].tolist() == [7.0, -9.0, -5.0]
+    assert result["air_con_diff"].tolist() == [17.0, -9.0, 85.0]
+    assert result["best"] == 1
+
+
+def test_compare_weather_range_beyond_district_window(monkeypatch):
+    requests = []
+    range_start = LOCAL_MIDNIGHT + (5 * 24 + 13) * 3600
+
+    def fake_many(*reqs):
+        requests.append(reqs)
+        # Destination and source in one range request pair; the last day is missing upstream
+        return [
+            [FakeResponse(range_start, np.arange(49.0)), FakeResponse(range_start, np.full(49, 10.0))],
+            [FakeResponse(range_start, np.arange(49.0)), FakeResponse(range_start, np.full(49, 10.0))],
+        ]
+
+    monkeypatch.setattr(openmateo_client, "weather_api_many", fake_many)
+    monkeypatch.setattr(openmateo_client, "_local_today", lambda: datetime.date(2025, 10, 18))
+    result = compare_weather_range(
+        source={"lat": 22.3569, "long": 91.7832},
+        destination=DISTRICTS[0],
+        start_date="2025-10-23",
+        end_date="2025-10-26"
+    )
+
+    assert len(requests) == 1 and len(requests[0]) == 2
+    assert requests[0][0][1]["latitude"] == [DISTRICTS[0]["lat"], 22.3569]
+    assert result["temp_diff"].tolist()[:3] == [-10.0, 14.0, 38.0]
+    assert np.isnan(result["temp_diff"][3])
+    assert result["best"] == 0
+
+
+def test_district_window_spans_comparison_hour_to_last_ranking_sample():
+    window = openmateo_client._district_window()
+    start = datetime.datetime.fromisoformat(window["start_hour"])
+    end = datetime.datetime.fromisoformat(window["end_hour"])
+
+    assert start.hour == 13
+    assert end - start == datetime.timedelta(days=6, hours=7)
+
+
+def test_stale_entries_are_served_immediately_and_refreshed(fake_download, monkeypatch):
+    cache = LocationForecastCache({}, expire_after=60, stale_ttl=3600)
+    monkeypatch.setattr(openmateo_client, "location_cache", cache)
+    params = {"latitude": [23.8], "longitude": [90.4], "hourly": "pm2_5"}
+    key = cache.key(AIR_URL, 23.8, 90.4, {"hourly": "pm2_5"})
+    cache.storage[key] = (time.time() - 10, _message(b"an hour old"))
+
+    started = time.monotonic()
+    assert weather_api(AIR_URL, params) == ["an hour old"]
+    assert time.monotonic() - started < 0.15
+
+    # The background refresh replaces the entry once the upstream answers
+    time.sleep(0.4)
+    assert len(fake_download) == 1
+    assert cache.lookup(key) == (_message(f"{AIR_URL}|23.8,90.4".encode()), True)
+
+
+def test_strict_fetch_skips_stale_entries(fake_download, monkeypatch):
+    cache = LocationForecastCache({}, expire_after=60, stale_ttl=3600)
+    monkeypatch.setattr(openmateo_client, "location_cache", cache)
+    params = {"latitude": [23.8], "longitude": [90.4], "hourly": "pm2_5"}
+    key = cache.key(AIR_URL, 23.8, 90.4, {"hourly": "pm2_5"})
+    cache.storage[key] = (time.time() - 10, _message(b"an hour old"))
+
+    assert weather_api(AIR_URL, params, serve_stale=False) == [f"{AIR_URL}|23.8,90.4"]
+    assert len(fake_download) == 1
+
+
+def test_open_circuit_fails_fast(monkeypatch):
+    attempts = []
+
+    async def failing_download(self, url, params, deadline):
+        attempts.append(url)
+        raise aiohttp.ClientConnectionError("connection refused")
+
+    monkeypatch.setattr(openmateo_client, "location_cache", LocationForecastCache({}, expire_after=60))
+    monkeypatch.setattr(openmateo_client, "_breakers", {})
+    monkeypatch.setattr(AsyncOpenMeteoClient, "_download", failing_download)
+    params = {"latitude": [23.8], "longitude": [90.4], "hourly": "temperature_2m"}
+
+    for _ in range(settings.OPENMETEO_BREAKER_FAILURES):
+        with pytest.raises(aiohttp.ClientConnectionError):
+            weather_api(WEATHER_URL, params)
+
+    with pytest.raises(CircuitOpenError):
+        weather_api(WEATHER_URL, params)
+    assert len(attempts) == settings.OPENMETEO_BREAKER_FAILURES
+
+
+async def _run_against(handler, coro_factory):
+    # Serves `handler` on a local port and runs the client against it
+    app = web.Application()
+    app.router.add_get("/v1/forecast", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await coro_factory(f"http://127.0.0.1:{port}/v1/forecast")
+    finally:
+        await runner.cleanup()
+
+
+def test_deadline_caps_total_retry_time():
+    async def always_502(request):
+        return web.Response(status=502)
+
+    async def main(url):
+        client = AsyncOpenMeteoClient()
+        loop = asyncio.get_running_loop()
+        try:
+            await client._download(url, {}, deadline=loop.time() + 0.5)
+        finally:
+            await client._session.close()
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(_run_against(always_502, main))
+    # Without a deadline five retries would back off for 6.2 s
+    assert time.monotonic() - started < 1.0
+
+
+def test_hedged_request_takes_the_first_answer(settings):
+    settings.OPENMETEO_HEDGE_DELAY = 0.1
+    served = []
+
+    async def slow_then_fast(request):
+        served.append(len(served))
+        if len(served) == 1:
+            await asyncio.sleep(2)
+            return web.Response(body=b"slow")
+        return web.Response(body=b"fast")
+
+    async def main(url):
+        client = AsyncOpenMeteoClient()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            return await client._download(url, {}, deadline=started + 5), loop.time() - started
+        finally:
+            await client._session.close()
+
+    body, elapsed = asyncio.run(_run_against(slow_then_fast, main))
+    assert body == b"fast"
+    assert elapsed < 1.0
+    assert len(served) == 2
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from utils.ranking_engine import RankingEngine
+
+
+def _names(records):
+    return [r["district_name"] for r in records]
+
+
+@pytest.fixture
+def engine():
+    rng = np.random.default_rng(2)
+    districts = [{"name": f"District {i:02d}", "lat": f"{20 + i / 10:.4f}", "long": "90.0"} for i in rng.permutation(64)]
+    temperature = np.round(rng.uniform(20, 24, (64, 7)))
+    pm2_5 = np.round(rng.uniform(10, 14, (64, 7)))
+    temperature[3, 2:5] = np.nan
+    pm2_5[7, :] = np.nan
+    days = np.arange("2025-10-18", "2025-10-25", dtype="datetime64[D]")
+    return RankingEngine(districts, days, temperature, pm2_5)
+
+
+def test_window_averages_match_nanmean(engine):
+    temperature, pm2_5 = engine.averages("2025-10-19", "2025-10-22")
+    with np.errstate(invalid="ignore"), pytest.warns(RuntimeWarning):
+        np.testing.assert_allclose(temperature, np.nanmean(engine.temperature[:, 1:5], axis=1))
+        np.testing.assert_allclose(pm2_5, np.nanmean(engine.pm2_5[:, 1:5], axis=1))
+
+
+@pytest.mark.parametrize("weights", [None, (1.0, 0.5), (0.0, 1.0)])
+def test_top_k_matches_full_sort(engine, weights):
+    full = _names(engine.rank(len(engine), start="2025-10-20", weights=weights))
+    for k in (1, 5, 10, 30):
+        assert _names(engine.rank(k, start="2025-10-20", weights=weights)) == full[:k]
+
+
+def test_default_order_is_temperature_then_pm_then_name(engine):
+    ranked = engine.rank(len(engine))
+    keys = [(r["avg_temperature_2pm"], r["avg_pm2_5"], r["district_name"]) for r in ranked if not np.isnan(r["avg_pm2_5"])]
+    assert keys == sorted(keys)
+    # The district without PM2.5 averages to NaN and ranks behind every district of equal temperature
+    assert np.isnan(ranked[-1]["avg_pm2_5"]) or ranked[-1]["avg_temperature_2pm"] >= ranked[-2]["avg_temperature_2pm"]
+
+
+def test_weighted_score_prefers_cleaner_air(engine):
+    [best] = engine.rank(1, weights=(0.0, 1.0))
+    _, pm2_5 = engine.averages()
+    assert best["avg_pm2_5"] == np.nanmin(pm2_5)
+
+
+def test_window_without_days(engine):
+    assert engine.rank(10, start="2025-11-01") == []
+
+
+def _forecasts(temperature, pm2_5):
+    times = np.arange(7) * 86400 + 1760796000  # 2025-10-18 14:00 UTC onwards
+    return (times, np.asarray(temperature, dtype=np.float32)), (times, np.asarray(pm2_5, dtype=np.float32))
+
+
+def test_unchanged_forecasts_reuse_the_previous_engine(engine):
+    weather, air = _forecasts(engine.temperature, engine.pm2_5)
+    previous = RankingEngine.from_forecasts(engine.districts, weather, air)
+
+    assert RankingEngine.from_forecasts(engine.districts, weather, air, previous=previous) is previous
+
+
+def test_only_the_changed_variable_is_recomputed(engine):
+    weather, air = _forecasts(engine.temperature, engine.pm2_5)
+    previous = RankingEngine.from_forecasts(engine.districts, weather, air)
+
+    refreshed_air = (air[0], air[1] + 50)
+    refreshed_air[1][0] = 0.0
+    updated = RankingEngine.from_forecasts(engine.districts, weather, refreshed_air, previous=previous)
+
+    assert updated is not previous
+    assert updated._temperature is previous._temperature
+    assert updated._pm2_5 is not previous._pm2_5
+    assert updated.digests[0] == previous.digests[0] and updated.digests[1] != previous.digests[1]
+    _, pm2_5 = updated.averages()
+    assert pm2_5[0] == 0.0
+
+    # Different districts or a shifted day axis rebuild everything
+    shifted = ((weather[0] + 86400, weather[1]), (air[0] + 86400, air[1]))
+    assert RankingEngine.from_forecasts(engine.districts, *shifted, previous=previous)._temperature is not previous._temperature
+    assert RankingEngine.from_forecasts(engine.districts[::-1], weather, air, previous=previous) is not previous
+
+
+def test_payload_round_trip(engine):
+    restored = RankingEngine.from_payload(engine.to_payload())
+    restored_ranking = restored.rank(64, start="2025-10-19", weights=(1.0, 1.0))
+    ranking = engine.rank(64, start="2025-10-19", weights=(1.0, 1.0))
+    assert _names(restored_ranking) == _names(ranking)
+    assert restored.digests == engine.digests
+    np.testing.assert_array_equal([r["score"] for r in restored_ranking], [r["score"] for r in ranking])
@@ -0,0 +1,111 @@
+import time
+import pytest
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from utils import ranking_snapshot
+from utils.ranking_engine import RankingEngine
+from utils.shared_files import PollInterval
+
+
+DISTRICTS = [
+    {"name": "Dhaka", "lat": "23.8103", "long": "90.4125"},
+    {"name": "Sylhet", "lat": "24.8949", "long": "91.8687"},
+]
+
+RANKED = [
+    {"district_name": "Sylhet", "avg_temperature_2pm": 25.0, "avg_pm2_5": 20.0, "lat": "24.8949", "long": "91.8687"},
+    {"district_name": "Dhaka", "avg_temperature_2pm": 28.0, "avg_pm2_5": 40.0, "lat": "23.8103", "long": "90.4125"},
+]
+
+ENGINE = RankingEngine(
+    DISTRICTS,
+    ["2025-10-18", "2025-10-19"],
+    temperature=[[26.0, 30.0], [25.0, 25.0]],
+    pm2_5=[[30.0, 50.0], [10.0, 30.0]]
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshot(settings, tmp_path, monkeypatch):
+    settings.RANKING_SNAPSHOT_PATH = str(tmp_path / "rankings.json")
+    monkeypatch.setattr(ranking_snapshot, "_snapshot", None)
+    monkeypatch.setattr(ranking_snapshot, "_snapshot_mtime", None)
+    monkeypatch.setattr(ranking_snapshot, "_disk_poll", PollInterval())
+
+
+@patch("utils.ranking_snapshot.build_ranking_engine", return_value=ENGINE)
+def test_snapshot_is_built_once_and_served_from_memory(mock_rank):
+    assert ranking_snapshot.get_top_districts(DISTRICTS, result_range=1) == RANKED[:1]
+    assert ranking_snapshot.get_top_districts(DISTRICTS, result_range=10) == RANKED
+    mock_rank.assert_called_once_with(DISTRICTS, previous=None)
+
+
+@patch("utils.ranking_snapshot.build_ranking_engine", return_value=ENGINE)
+def test_snapshot_past_staleness_bound_is_rebuilt(mock_rank, settings):
+    ranking_snapshot.get_snapshot(DISTRICTS)
+    stale = ranking_snapshot.RankingSnapshot(records=RANKED, built_at=time.time() - settings.RANKING_MAX_STALENESS - 1)
+    ranking_snapshot._swap(stale)
+
+    snapshot = ranking_snapshot.get_snapshot(DISTRICTS)
+    assert snapshot.age < 1
+    assert mock_rank.call_count == 2
+
+
+@patch("utils.ranking_snapshot.build_ranking_engine", return_value=ENGINE)
+def test_snapshot_is_picked_up_from_disk_by_other_workers(mock_rank):
+    ranking_snapshot.refresh_snapshot(DISTRICTS, force=True)
+
+    # Simulate a second worker that has not built anything yet
+    ranking_snapshot._swap(None)
+    ranking_snapshot._disk_poll.reset()
+
+    assert ranking_snapshot.get_top_districts(DISTRICTS) == RANKED
+    mock_rank.assert_called_once()
+
+
+@patch("utils.ranking_snapshot.build_ranking_engine", return_value=ENGINE)
+def test_parameterized_ranking_is_served_by_the_snapshot_engine(mock_rank):
+    ranking_snapshot.get_top_districts(DISTRICTS)
+
+    # On 2025-10-18 alone Dhaka is 1 degree warmer but its PM2.5 is 20 higher
+    [first] = ranking_snapshot.get_top_districts(DISTRICTS, result_range=1, start="2025-10-18", end="2025-10-18")
+    assert first["district_name"] == "Sylhet"
+    ranked = ranking_snapshot.get_top_districts(DISTRICTS, weights=(1.0, 0.0))
+    assert [r["district_name"] for r in ranked] == ["Sylhet", "Dhaka"]
+    assert ranked[0]["score"] < ranked[1]["score"]
+    mock_rank.assert_called_once()
+
+
+@patch("utils.ranking_snapshot.build_ranking_engine", return_value=ENGINE)
+def test_engine_is_restored_from_disk(mock_rank):
+    ranking_snapshot.refresh_snapshot(DISTRICTS, force=True)
+    ranking_snapshot._swap(None)
+    ranking_snapshot._disk_poll.reset()
+
+    snapshot = ranking_snapshot.get_snapshot(DISTRICTS)
+    assert snapshot.engine.rank(2, weights=(0.0, 1.0)) == ENGINE.rank(2, weights=(0.0, 1.0))
+    mock_rank.assert_called_once()
+
+
+def test_refresh_with_unchanged_forecasts_keeps_the_ranking(monkeypatch):
+    engines = []
+
+    def fake_build(districts, previous=None):
+        engines.append(previous)
+        return previous or ENGINE
+
+    monkeypatch.setattr(ranking_snapshot, "build_ranking_engine", fake_build)
+    first = ranking_snapshot.refresh_snapshot(DISTRICTS, force=True)
+    second = ranking_snapshot.refresh_snapshot(DISTRICTS, force=True)
+
+    assert engines == [None, ENGINE]
+    assert second.records is first.records
+    assert second.built_at >= first.built_at
+
+
+@patch("core.management.commands.refresh_rankings.refresh_snapshot", side_effect=RuntimeError("upstream down"))
+def test_refresh_rankings_once_fails_with_the_error(mock_refresh):
+    with pytest.raises(CommandError, match="upstream down"):
+        call_command("refresh_rankings", "--once")
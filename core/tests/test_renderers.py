@@ -0,0 +1,39 @@
+import json
+import decimal
+import numpy as np
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.renderers import FastJSONRenderer
+
+
+DATA = [
+    {"district_name": "Cox's Bazar", "avg_temperature_2pm": 28.25, "avg_pm2_5": 40.0, "lat": "21.4272", "long": "92.0058"},
+    {"district_name": "ঢাকা ", "avg_temperature_2pm": 0.1, "avg_pm2_5": None, "count": 3, "ok": True},
+]
+
+
+def test_matches_the_stock_renderer():
+    assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+
+def test_exponent_notation_may_differ_but_parses_equal():
+    data = {"small": 1e-7, "large": 1.5e300}
+    assert json.loads(FastJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+
+def test_types_outside_json_go_through_drf_encoder():
+    data = {"amount": decimal.Decimal("1.50"), "values": np.array([1.0, 2.5])}
+    assert json.loads(FastJSONRenderer().render(data)) == {"amount": 1.5, "values": [1.0, 2.5]}
+
+
+def test_indented_output_uses_the_stock_renderer():
+    assert FastJSONRenderer().render(DATA, "application/json; indent=2") == JSONRenderer().render(DATA, "application/json; indent=2")
+
+
+def test_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+    with pytest.raises(ValueError):
+        FastJSONRenderer().render({"value": float("nan")})
@@ -0,0 +1,136 @@
+import time
+import asyncio
+import threading
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from utils import sampling_profiler
+from utils.sampling_profiler import SamplingProfiler
+
+
+@pytest.fixture(autouse=True)
+def profiler_paths(settings, tmp_path):
+    settings.PROFILER_CONTROL_PATH = str(tmp_path / "profiler.json")
+    settings.PROFILER_OUTPUT_DIR = str(tmp_path / "profiles")
+    sampling_profiler._control = None
+    yield
+    sampling_profiler._control = None
+
+
+def busy_wait_in_hot_function(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_sampled_request_writes_folded_stacks():
+    profiler = SamplingProfiler(interval=0.001)
+
+    trace = profiler.begin(always=True)
+    busy_wait_in_hot_function(0.1)
+    profiler.end(trace, label="core:best-cities-to-visit")
+    profiler.flush()
+
+    with open(profiler.output_path()) as f:
+        lines = f.read().splitlines()
+
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.startswith("core:best-cities-to-visit;")
+    assert any("busy_wait_in_hot_function" in line for line in lines)
+
+
+def test_fast_request_under_threshold_is_not_recorded():
+    profiler = SamplingProfiler(interval=0.001)
+
+    trace = profiler.begin(always=False, threshold=5.0)
+    busy_wait_in_hot_function(0.02)
+    profiler.end(trace, label="fast")
+    profiler.flush()
+
+    assert not trace.samples
+    assert not profiler._stacks
+
+
+def test_slow_request_is_sampled_after_threshold():
+    profiler = SamplingProfiler(interval=0.001)
+
+    trace = profiler.begin(always=False, threshold=0.02)
+    busy_wait_in_hot_function(0.1)
+    profiler.end(trace, label="slow")
+
+    assert sum(trace.samples.values()) > 0
+
+
+def test_should_sample_every_nth_request():
+    picks = [sampling_profiler.should_sample(4) for _ in range(40)]
+    assert sum(picks) == 10
+    assert not any(sampling_profiler.should_sample(0) for _ in range(10))
+
+
+@pytest.mark.django_db
+def test_runtime_toggle_is_admin_only():
+    User = get_user_model()
+    client = APIClient()
+
+    client.force_authenticate(User.objects.create_user(username="user", password="pass12345"))
+    assert client.post("/api/core/profiler/", {"enabled": True}, format="json").status_code == 403
+
+    client.force_authenticate(User.objects.create_superuser(username="admin", password="pass12345"))
+    response = client.post("/api/core/profiler/", {"enabled": True, "sample_rate": 10}, format="json")
+
+    assert response.status_code == 200
+    assert response.data["enabled"] is True
+    assert response.data["sample_rate"] == 10
+
+    # Another worker reading the control file sees the same switch
+    sampling_profiler._control = None
+    assert sampling_profiler.current_config()["enabled"] is True
+
+
+class RecordingProfiler(SamplingProfiler):
+    def __init__(self):
+        super().__init__(interval=0.001)
+        self.ended = []
+
+    def end(self, trace, label):
+        self.ended.append((trace.thread_id, label))
+        super().end(trace, label)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_views_are_profiled_under_asgi(settings, monkeypatch):
+    from django.core.handlers.asgi import ASGIHandler
+
+    settings.PROFILER_ENABLED = True
+    settings.PROFILER_SAMPLE_RATE = 1
+    recorder = RecordingProfiler()
+    monkeypatch.setattr("core.middleware.profiler", recorder)
+
+    async def request():
+        sent = []
+        received = []
+
+        async def receive():
+            if not received:
+                received.append(True)
+                return {"type": "http.request", "body": b""}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            sent.append(message)
+
+        await ASGIHandler()({
+            "type": "http", "method": "GET", "path": "/api/core/districts/autocomplete/",
+            "query_string": b"q=dha", "headers": [(b"host", b"testserver")],
+        }, receive, send)
+        return sent[0]["status"], threading.get_ident()
+
+    status, loop_thread = asyncio.run(request())
+
+    assert status == 401
+    assert recorder.ended == [(recorder.ended[0][0], "core:district-autocomplete")]
+    # Traced in the thread running the sync view, not the event loop's
+    assert recorder.ended[0][0] != loop_thread
@@ -0,0 +1,38 @@
+import os
+import pytest
+
+from utils.shared_files import write_atomic, file_mtime, PollInterval
+
+
+def test_write_atomic_replaces_file_and_returns_mtime(tmp_path):
+    path = str(tmp_path / "data.json")
+    write_atomic(path, "old")
+    mtime = write_atomic(path, "new")
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "new"
+    assert mtime == file_mtime(path)
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_write_atomic_failure_leaves_target_untouched(tmp_path):
+    path = str(tmp_path / "data.json")
+    write_atomic(path, "old")
+
+    with pytest.raises(TypeError):
+        write_atomic(path, b"not text")
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "old"
+    assert os.listdir(tmp_path) == ["data.json"]
+    assert file_mtime(str(tmp_path / "missing.json")) is None
+
+
+def test_poll_interval_is_due_once_per_interval():
+    poll = PollInterval(seconds=60)
+    assert poll.due()
+    assert not poll.due()
+    assert poll.due(force=True)
+
+    poll.reset()
+    assert poll.due()
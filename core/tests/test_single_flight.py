@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+
+from utils.single_flight import SingleFlight, worker_lock
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "payload"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["payload"] * 5
+    assert len(calls) == 1
+    assert flights.in_flight() == 0
+
+
+def test_single_flight_shares_errors_and_forgets_failed_calls():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flights.in_flight() == 0
+
+
+def test_worker_lock_serializes_holders(tmp_path):
+    events = []
+
+    async def hold(name):
+        async with worker_lock(str(tmp_path), "same-key"):
+            events.append(f"{name}-in")
+            await asyncio.sleep(0.05)
+            events.append(f"{name}-out")
+
+    async def main():
+        await asyncio.gather(hold("a"), hold("b"))
+
+    asyncio.run(main())
+    assert events in (["a-in", "a-out", "b-in", "b-out"], ["b-in", "b-out", "a-in", "a-out"])
+
+
+@pytest.mark.parametrize("lock_dir", [None, ""])
+def test_worker_lock_is_noop_without_directory(lock_dir):
+    async def main():
+        async with worker_lock(lock_dir, "key"):
+            return True
+
+    assert asyncio.run(main())
+
+
+def test_single_flight_survives_cancelled_callers():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "payload"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flights.do("key", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        followers[0].cancel()
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(leader, *followers, return_exceptions=True)
+        return [type(r) if isinstance(r, BaseException) else r for r in results]
+
+    assert asyncio.run(main()) == [asyncio.CancelledError, asyncio.CancelledError, "payload"]
+    assert len(calls) == 1
+    assert flights.in_flight() == 0
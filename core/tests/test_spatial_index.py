@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from utils.spatial_index import GridIndex, haversine_km
+
+
+def test_haversine_known_distance():
+    # Dhaka to Chattogram is roughly 215 km as the crow flies
+    assert haversine_km(23.8103, 90.4125, np.array([22.3569]), np.array([91.7832]))[0] == pytest.approx(215, abs=5)
+
+
+@pytest.mark.parametrize("k", [1, 3, 10])
+def test_grid_matches_brute_force(k):
+    rng = np.random.default_rng(7)
+    lats, longs = rng.uniform(20.8, 26.5, 64), rng.uniform(88.1, 92.6, 64)
+    index = GridIndex(lats, longs)
+
+    # Queries inside the grid, on its edge and far outside it
+    queries = np.column_stack((rng.uniform(18, 29, 200), rng.uniform(85, 95, 200)))
+    for lat, long in queries:
+        expected = np.argsort(haversine_km(lat, long, lats, longs), kind="stable")[:k]
+        indices, distances = index.nearest(lat, long, k=k)
+        assert indices.tolist() == expected.tolist()
+        assert np.all(np.diff(distances) >= 0)
+
+
+def test_max_km_limits_results():
+    index = GridIndex([23.8103, 22.3569], [90.4125, 91.7832])
+
+    indices, distances = index.nearest(23.80, 90.40, k=2, max_km=20)
+    assert indices.tolist() == [0]
+    assert distances[0] < 2
+
+    indices, _ = index.nearest(25.0, 89.0, k=1, max_km=20)
+    assert indices.tolist() == []
+
+
+def test_empty_index():
+    indices, distances = GridIndex([], []).nearest(23.8, 90.4)
+    assert len(indices) == 0 and len(distances) == 0
@@ -0,0 +1,89 @@
+import time
+import pytest
+from unittest.mock import patch
+from django.test import override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from utils.timing import StageMetrics, stage, start_request, end_request, server_timing_header
+from utils.ranking_snapshot import RankingSnapshot
+
+
+def test_stage_accumulates_into_current_request():
+    stages, token = start_request()
+    try:
+        with stage("decode"):
+            pass
+        with stage("decode"):
+            pass
+        with stage("upstream_fetch"):
+            pass
+    finally:
+        end_request(token)
+
+    assert set(stages) == {"decode", "upstream_fetch"}
+    header = server_timing_header(stages, 12.5)
+    assert header.startswith("decode;dur=")
+    assert header.endswith("total;dur=12.50")
+
+
+def test_stage_outside_request_only_feeds_histograms():
+    with stage("ranking"):
+        pass  # no request context; must not raise
+
+
+def test_histogram_render_is_cumulative():
+    metrics = StageMetrics()
+    metrics.observe("stage", "decode", 0.003)
+    metrics.observe("stage", "decode", 0.2)
+    text = metrics.render()
+
+    assert "# TYPE weather_api_stage_duration_seconds histogram" in text
+    assert 'weather_api_stage_duration_seconds_bucket{stage="decode",le="0.001"} 0' in text
+    assert 'weather_api_stage_duration_seconds_bucket{stage="decode",le="0.005"} 1' in text
+    assert 'weather_api_stage_duration_seconds_bucket{stage="decode",le="+Inf"} 2' in text
+    assert 'weather_api_stage_duration_seconds_count{stage="decode"} 2' in text
+
+
+@pytest.fixture
+def api_client_with_token(db):
+    user = get_user_model().objects.create_user(username="testuser", password="testpass123")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    return client
+
+
+@override_settings(METRICS_ENABLED=True)
+@patch("core.views.get_districts")
+@patch("core.views.get_snapshot", return_value=RankingSnapshot(records=[], built_at=time.time()))
+@patch("core.views.get_top_districts")
+def test_server_timing_header_on_top_districts(mock_top_districts, mock_snapshot, mock_get_districts, api_client_with_token):
+    mock_get_districts.return_value = [{"name": "Dhaka", "lat": "23.8103", "long": "90.4125"}]
+    mock_top_districts.return_value = [
+        {"district_name": "Dhaka", "avg_temperature_2pm": 28.0, "avg_pm2_5": 40.0, "lat": "23.8103", "long": "90.4125"}
+    ]
+
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/")
+
+    assert response.status_code == 200
+    assert "serialization;dur=" in response["Server-Timing"]
+    assert "total;dur=" in response["Server-Timing"]
+
+    metrics = APIClient().get("/api/core/metrics/")
+    assert metrics.status_code == 200
+    assert 'view="core:best-cities-to-visit"' in metrics.content.decode()
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_off_by_default(client):
+    assert client.get("/api/core/metrics/").status_code == 404
+
+
+@pytest.mark.django_db
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN="scrape-secret")
+def test_metrics_endpoint_requires_token_when_configured(client):
+    assert client.get("/api/core/metrics/").status_code == 401
+    response = client.get("/api/core/metrics/", HTTP_AUTHORIZATION="Bearer scrape-secret")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
@@ -1,10 +1,14 @@
+import time
 import pytest
 from unittest.mock import patch
 from django.contrib.auth import get_user_model
+from django.utils.http import http_date
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from datetime import date, timedelta
 
+from utils.ranking_snapshot import RankingSnapshot
+
 User = get_user_model()
 
 @pytest.mark.django_db
@@ -24,8 +28,9 @@ def api_client_with_token(db):
 
 
 @patch("core.views.get_districts")
-@patch("core.views.get_top_districts_to_visit")
-def test_top_districts_success(mock_top_districts, mock_get_districts, api_client_with_token):
+@patch("core.views.get_snapshot", return_value=RankingSnapshot(records=[], built_at=time.time()))
+@patch("core.views.get_top_districts")
+def test_top_districts_success(mock_top_districts, mock_snapshot, mock_get_districts, api_client_with_token):
     mock_get_districts.return_value = [
         {"name": "Dhaka", "lat": "23.8103", "long": "90.4125"},
         {"name": "Somewhere", "lat": "33.8103", "long": "83.4125"}
@@ -37,8 +42,101 @@ def test_top_districts_success(mock_top_districts, mock_get_districts, api_clien
 
     response = api_client_with_token.get("/api/core/best-cities-to-visit/")
     assert response.status_code == 200
-    assert isinstance(response.data, list)
-    assert response.data[0]["district_name"] == "Dhaka"
+    assert response["Content-Type"] == "application/json"
+    assert isinstance(response.json(), list)
+    assert response.json()[0]["district_name"] == "Dhaka"
+
+    # The rendered body is kept with the snapshot and reused until the next one
+    repeat = api_client_with_token.get("/api/core/best-cities-to-visit/")
+    assert repeat.content == response.content
+    mock_top_districts.assert_called_once()
+
+
+@patch("core.views.get_districts", return_value=[{"name": "Dhaka", "lat": "23.8103", "long": "90.4125"}])
+@patch("core.views.get_snapshot", return_value=RankingSnapshot(records=[], built_at=time.time()))
+@patch("core.views.get_top_districts")
+def test_top_districts_parameters(mock_top_districts, mock_snapshot, mock_get_districts, api_client_with_token):
+    mock_top_districts.return_value = [
+        {"district_name": "Dhaka", "avg_temperature_2pm": 28.0, "avg_pm2_5": 40.0, "lat": "23.8103", "long": "90.4125", "score": -0.5}
+    ]
+
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/", {
+        "k": 3, "start_date": "2025-10-19", "end_date": "2025-10-21", "pm2_5_weight": 2
+    })
+
+    assert response.status_code == 200
+    assert response.data[0]["score"] == -0.5
+    kwargs = mock_top_districts.call_args.kwargs
+    assert kwargs["result_range"] == 3
+    assert (kwargs["start"].isoformat(), kwargs["end"].isoformat()) == ("2025-10-19", "2025-10-21")
+    assert kwargs["weights"] == (0.0, 2.0)
+
+
+def test_top_districts_parameter_validation(api_client_with_token):
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/", {"k": 0})
+    assert response.status_code == 400 and "k" in response.data
+
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/", {"start_date": "2025-10-21", "end_date": "2025-10-19"})
+    assert response.status_code == 400 and "end_date" in response.data
+
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/", {"temperature_weight": 0, "pm2_5_weight": 0})
+    assert response.status_code == 400
+
+
+@patch("core.views.get_districts", return_value=[{"name": "Dhaka", "lat": "23.8103", "long": "90.4125"}])
+@patch("core.views.get_snapshot")
+@patch("core.views.get_top_districts", return_value=[])
+def test_top_districts_conditional_get(mock_top_districts, mock_snapshot, mock_get_districts, api_client_with_token, settings):
+    built_at = time.time()
+    mock_snapshot.return_value = RankingSnapshot(records=[], built_at=built_at, changed_at=built_at - 60)
+
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/")
+    etag = response["ETag"]
+    assert response.status_code == 200
+    assert etag.startswith('"')
+    assert "private" in response["Cache-Control"]
+    max_age = int(response["Cache-Control"].split("max-age=")[1].split(",")[0])
+    assert settings.RANKING_REFRESH_INTERVAL - 5 <= max_age <= settings.RANKING_REFRESH_INTERVAL
+
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert mock_top_districts.call_count == 1
+
+    # Another query, media type or a new ranking is a different representation
+    assert "Accept" in response["Vary"]
+    assert api_client_with_token.get("/api/core/best-cities-to-visit/", {"k": 3}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    html = api_client_with_token.get("/api/core/best-cities-to-visit/", HTTP_ACCEPT="text/html", HTTP_IF_NONE_MATCH=etag)
+    assert html.status_code == 200 and html["ETag"] != etag
+    mock_snapshot.return_value = RankingSnapshot(records=[], built_at=time.time())
+    assert api_client_with_token.get("/api/core/best-cities-to-visit/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    # Validators never bypass authentication
+    assert APIClient().get("/api/core/best-cities-to-visit/", HTTP_IF_NONE_MATCH=etag).status_code == 401
+
+
+@patch("core.views.get_districts", return_value=[{"name": "Dhaka", "lat": "23.8103", "long": "90.4125"}])
+@patch("core.views.get_districts_version")
+@patch("core.views.get_snapshot")
+@patch("core.views.get_top_districts", return_value=[])
+def test_top_districts_last_modified_covers_district_data(
+    mock_top_districts, mock_snapshot, mock_districts_version, mock_get_districts, api_client_with_token
+):
+    built_at = int(time.time())
+    mock_snapshot.return_value = RankingSnapshot(records=[], built_at=built_at, changed_at=built_at - 60)
+    mock_districts_version.return_value = built_at - 120
+
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/")
+    assert response["Last-Modified"] == http_date(built_at - 60)
+
+    # A newer data.json moves Last-Modified forward, so If-Modified-Since no longer matches
+    mock_districts_version.return_value = built_at - 10
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/", HTTP_IF_MODIFIED_SINCE=http_date(built_at - 60))
+    assert response.status_code == 200
+    assert response["Last-Modified"] == http_date(built_at - 10)
+
+    response = api_client_with_token.get("/api/core/best-cities-to-visit/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert response.status_code == 304
 
 
 @patch("core.views.get_districts", side_effect=Exception("File not found"))
@@ -142,3 +240,186 @@ def test_travel_recommendation_date_beyond_limit(api_client_with_token):
     })
     assert response.status_code == 400
     assert "Travel date must be within 15 days" in str(response.data)
+
+
+NEARBY_DISTRICTS = [
+    {"name": "Dhaka", "lat": "23.8103", "long": "90.4125"},
+    {"name": "Chattogram", "lat": "22.3569", "long": "91.7832"},
+    {"name": "Sylhet", "lat": "24.8949", "long": "91.8687"},
+]
+
+
+@patch("core.views.get_districts", return_value=NEARBY_DISTRICTS)
+def test_nearest_districts(mock_get_districts, api_client_with_token):
+    response = api_client_with_token.get("/api/core/districts/nearest/", {"lat": 23.75, "long": 90.40, "k": 2})
+
+    assert response.status_code == 200
+    assert [d["name"] for d in response.data] == ["Dhaka", "Sylhet"]
+    assert response.data[0]["distance_km"] < 10
+
+    repeat = api_client_with_token.get(
+        "/api/core/districts/nearest/", {"lat": 23.75, "long": 90.40, "k": 2}, HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert repeat.status_code == 304
+
+
+@patch("core.views.get_districts", return_value=NEARBY_DISTRICTS)
+@patch("core.views.compare_weather", return_value={"temp_diff": -2, "air_con_diff": -5})
+@patch("core.views.generate_weather_message", return_value="Cooler and cleaner.")
+def test_travel_recommendation_snaps_source_to_nearest_district(mock_message, mock_compare, mock_get_districts, api_client_with_token):
+    travel_date = (date.today() + timedelta(days=3)).isoformat()
+    response = api_client_with_token.get("/api/core/travel-recommendation/", {
+        "destination": "Sylhet", "lat": 22.36, "long": 91.78, "date": travel_date, "source_mode": "nearest"
+    })
+
+    assert response.status_code == 200
+    assert response.data["source"]["mode"] == "nearest"
+    assert response.data["source"]["district"] == "Chattogram"
+    kwargs = mock_compare.call_args.kwargs
+    assert kwargs["source"]["name"] == "Chattogram"
+    assert kwargs["source_is_district"] is True
+
+
+@patch("core.views.get_districts", return_value=NEARBY_DISTRICTS)
+@patch("core.views.compare_weather", return_value={"temp_diff": -2, "air_con_diff": -5})
+@patch("core.views.generate_weather_message", return_value="Cooler and cleaner.")
+def test_travel_recommendation_keeps_source_outside_tolerance(mock_message, mock_compare, mock_get_districts, api_client_with_token):
+    travel_date = (date.today() + timedelta(days=3)).isoformat()
+    response = api_client_with_token.get("/api/core/travel-recommendation/", {
+        "destination": "Sylhet", "lat": 21.0, "long": 89.0, "date": travel_date,
+        "source_mode": "nearest", "snap_tolerance_km": 5
+    })
+
+    assert response.status_code == 200
+    assert response.data["source"] == {"mode": "exact", "district": None, "distance_km": None}
+    kwargs = mock_compare.call_args.kwargs
+    assert kwargs["source"] == {"lat": 21.0, "long": 89.0}
+    assert not kwargs.get("source_is_district")
+
+
+class FakeField:
+    error_bound = {"temperature_2m": 0.4, "pm2_5": 3.1}
+
+    def __init__(self, estimate):
+        self._estimate = estimate
+
+    def estimate(self, lat, long):
+        return self._estimate
+
+
+@patch("core.views.get_districts", return_value=NEARBY_DISTRICTS)
+@patch("core.views.get_field", return_value=FakeField((29.5, 60.0)))
+@patch("core.views.compare_weather", return_value={"temp_diff": -2, "air_con_diff": -5})
+@patch("core.views.generate_weather_message", return_value="Cooler and cleaner.")
+def test_travel_recommendation_interpolates_source(mock_message, mock_compare, mock_field, mock_get_districts, api_client_with_token):
+    travel_date = (date.today() + timedelta(days=3)).isoformat()
+    response = api_client_with_token.get("/api/core/travel-recommendation/", {
+        "destination": "Sylhet", "lat": 23.1, "long": 91.0, "date": travel_date, "source_mode": "interpolate"
+    })
+
+    assert response.status_code == 200
+    assert response.data["source"] == {"mode": "interpolate", "error_bound": {"temperature_2m": 0.4, "pm2_5": 3.1}}
+    assert mock_compare.call_args.kwargs["source_values"] == (29.5, 60.0)
+
+
+@patch("core.views.get_districts", return_value=NEARBY_DISTRICTS)
+@patch("core.views.get_field", return_value=FakeField(None))
+@patch("core.views.compare_weather", return_value={"temp_diff": -2, "air_con_diff": -5})
+@patch("core.views.generate_weather_message", return_value="Cooler and cleaner.")
+def test_travel_recommendation_interpolation_falls_back_outside_coverage(mock_message, mock_compare, mock_field, mock_get_districts, api_client_with_token):
+    travel_date = (date.today() + timedelta(days=3)).isoformat()
+    response = api_client_with_token.get("/api/core/travel-recommendation/", {
+        "destination": "Sylhet", "lat": 10.0, "long": 80.0, "date": travel_date, "source_mode": "interpolate"
+    })
+
+    assert response.status_code == 200
+    assert response.data["source"] == {"mode": "exact", "error_bound": None}
+    assert "source_values" not in mock_compare.call_args.kwargs
+
+
+@patch("core.views.get_districts", return_value=NEARBY_DISTRICTS)
+@patch("core.views.compare_weather_range")
+def test_travel_recommendation_date_range(mock_compare_range, mock_get_districts, api_client_with_token):
+    start, end = date.today() + timedelta(days=1), date.today() + timedelta(days=3)
+    mock_compare_range.return_value = {
+        "dates": [(start + timedelta(days=n)).isoformat() for n in range(3)],
+        "temp_diff": [2.0, -4.0, float("nan")],
+        "air_con_diff": [5.0, -12.0, float("nan")],
+        "best": 1,
+    }
+
+    response = api_client_with_token.get("/api/core/travel-recommendation/", {
+        "destination": "Sylhet", "lat": 23.1, "long": 91.0,
+        "date": start.isoformat(), "end_date": end.isoformat()
+    })
+
+    assert response.status_code == 200
+    assert response.data["recommendation"] == "Recommended"
+    assert response.data["best_day"] == (start + timedelta(days=1)).isoformat()
+    assert [day["recommendation"] for day in response.data["days"]] == ["Not Recommended", "Recommended", None]
+    assert response.data["days"][1]["temp_diff"] == -4.0
+    assert mock_compare_range.call_args.args[2:] == (start.isoformat(), end.isoformat())
+
+
+def test_travel_recommendation_date_range_validation(api_client_with_token):
+    start = date.today() + timedelta(days=5)
+    params = {"destination": "Sylhet", "lat": 23.1, "long": 91.0, "date": start.isoformat()}
+
+    response = api_client_with_token.get("/api/core/travel-recommendation/", {
+        **params, "end_date": (start - timedelta(days=1)).isoformat()
+    })
+    assert response.status_code == 400
+    assert "end_date" in response.data
+
+    response = api_client_with_token.get("/api/core/travel-recommendation/", {
+        **params, "end_date": (date.today() + timedelta(days=16)).isoformat()
+    })
+    assert response.status_code == 400
+    assert "end_date" in response.data
+
+
+@patch("core.views.get_districts", return_value=NEARBY_DISTRICTS)
+@patch("core.views.compare_weather_many")
+@patch("core.views.generate_weather_message", return_value="Weather summary.")
+def test_travel_recommendation_batch(mock_message, mock_compare_many, mock_get_districts, api_client_with_token):
+    mock_compare_many.return_value = [
+        {"temp_diff": -2, "air_con_diff": -5},
+        None,
+        {"temp_diff": 3, "air_con_diff": 1},
+    ]
+    day_1 = (date.today() + timedelta(days=1)).isoformat()
+    day_2 = (date.today() + timedelta(days=2)).isoformat()
+    queries = [
+        {"destination": "Dhaka", "lat": 22.36, "long": 91.78, "date": day_1},
+        {"destination": "Atlantis", "lat": 22.36, "long": 91.78, "date": day_1},
+        {"destination": "sylhet", "lat": 22.36, "long": 91.78, "date": day_2},
+        {"destination": "Chattogram", "lat": 23.81, "long": 90.41, "date": day_1, "source_mode": "nearest"},
+    ]
+
+    response = api_client_with_token.post("/api/core/travel-recommendation/batch/", {"queries": queries}, format="json")
+
+    assert response.status_code == 200
+    results = response.data["results"]
+    assert [r["success"] for r in results] == [True, False, False, True]
+    assert results[0]["recommendation"] == "Recommended"
+    assert "Atlantis" in results[1]["message"]
+    assert results[2]["message"].startswith(f"No forecast available for {day_2}")
+    assert results[3]["recommendation"] == "Not Recommended"
+    assert results[3]["source"]["district"] == "Dhaka"
+
+    # One batched comparison call for the three resolvable queries
+    [comparisons] = mock_compare_many.call_args.args
+    assert [c["destination"]["name"] for c in comparisons] == ["Dhaka", "Sylhet", "Chattogram"]
+    assert comparisons[2]["source_is_district"] is True
+
+
+def test_travel_recommendation_batch_validation(api_client_with_token, settings):
+    url = "/api/core/travel-recommendation/batch/"
+    assert api_client_with_token.post(url, {"queries": []}, format="json").status_code == 400
+
+    query = {"destination": "Dhaka", "lat": 22.36, "long": 91.78, "date": date.today().isoformat()}
+    too_many = {"queries": [query] * 51}
+    assert api_client_with_token.post(url, too_many, format="json").status_code == 400
+
+    response = api_client_with_token.post(url, {"queries": [{**query, "lat": "north"}]}, format="json")
+    assert response.status_code == 400
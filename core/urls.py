@@ -1,9 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from .views import TopDistricts, TravelRecommendation
+from .views import TopDistricts, TravelRecommendation, TravelRecommendationBatch, DistrictAutocomplete, NearestDistricts, ProfilerControl, stage_metrics
 
 app_name = 'core'
 
+if settings.ASYNC_VIEWS:
+    from .async_views import top_districts, travel_recommendation
+else:
+    top_districts, travel_recommendation = TopDistricts.as_view(), TravelRecommendation.as_view()
+
 urlpatterns = [
-    path('best-cities-to-visit/', TopDistricts.as_view(), name='best-cities-to-visit'),
-    path('travel-recommendation/', TravelRecommendation.as_view(), name='travel-recommendation'),
+    path('best-cities-to-visit/', top_districts, name='best-cities-to-visit'),
+    path('travel-recommendation/', travel_recommendation, name='travel-recommendation'),
+    path('travel-recommendation/batch/', TravelRecommendationBatch.as_view(), name='travel-recommendation-batch'),
+    path('districts/autocomplete/', DistrictAutocomplete.as_view(), name='district-autocomplete'),
+    path('districts/nearest/', NearestDistricts.as_view(), name='nearest-districts'),
+    path('metrics/', stage_metrics, name='metrics'),
+    path('profiler/', ProfilerControl.as_view(), name='profiler'),
 ]
\ No newline at end of file
@@ -1,18 +1,44 @@
+import time
+from datetime import date, timedelta
+from django.conf import settings
+from django.http import HttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import status, permissions
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 
-from utils.openmateo_client import get_top_districts_to_visit, compare_weather
-from utils.district_data_loader import get_districts
+from utils.openmateo_client import compare_weather, compare_weather_many, compare_weather_range, COMPARISON_HOUR
+from utils.forecast_field import get_field
+from utils.district_data_loader import get_districts, get_districts_version
+from utils.district_registry import registry_for
+from utils.ranking_snapshot import get_snapshot, get_top_districts
 from utils.message_generator import generate_weather_message
-from .serializers import DistrictAirWeatherSerializer, TravelRecommendationQuerySerializer
+from utils.timing import stage, metrics
+from utils.http_cache import strong_etag, conditional_response, with_validators
+from utils.sampling_profiler import current_config, update_config
+from .serializers import (
+    DistrictAirWeatherSerializer, TopDistrictsQuerySerializer, TravelRecommendationRangeQuerySerializer, TravelRecommendationBatchSerializer,
+    ProfilerControlSerializer,
+    DistrictSerializer, DistrictAutocompleteQuerySerializer,
+    NearestDistrictSerializer, NearestDistrictsQuerySerializer
+)
 
 
 @extend_schema(
     summary="Top Districts to Visit",   
-    description="Returns a list of the top 10 districts in Bangladesh recommended for travel based on weather and air quality.",
+    description=(
+        "Returns the top districts in Bangladesh recommended for travel based on weather and air quality. "
+        "By default the 10 districts with the lowest average 2 PM temperature over the forecast, ties by PM2.5; "
+        "a date window and weights rank any k districts from the same cached forecasts."
+    ),
     tags=["Travel"],
+    parameters=[
+        OpenApiParameter(name='k', type=int, required=False, location=OpenApiParameter.QUERY, description='Number of districts to return (default 10)'),
+        OpenApiParameter(name='start_date', type=str, required=False, location=OpenApiParameter.QUERY, description='First day averaged (YYYY-MM-DD)'),
+        OpenApiParameter(name='end_date', type=str, required=False, location=OpenApiParameter.QUERY, description='Last day averaged (YYYY-MM-DD)'),
+        OpenApiParameter(name='temperature_weight', type=float, required=False, location=OpenApiParameter.QUERY, description='Rank by a weighted score; weight of the standardized temperature'),
+        OpenApiParameter(name='pm2_5_weight', type=float, required=False, location=OpenApiParameter.QUERY, description='Rank by a weighted score; weight of the standardized PM2.5')
+    ],
     responses={
         200: DistrictAirWeatherSerializer(many=True),
         500: OpenApiExample(
@@ -23,6 +49,10 @@ from .serializers import DistrictAirWeatherSerializer, TravelRecommendationQuery
 )
 class TopDistricts(APIView):
     def get(self, request):
+        serializer = TopDistrictsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
         try:
             districts = get_districts()
 
@@ -33,9 +63,55 @@ class TopDistricts(APIView):
                 "details": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        top_10_districts = get_top_districts_to_visit(districts, result_range=10)
-        serializer = DistrictAirWeatherSerializer(top_10_districts, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # The answer only changes with the forecasts, the district list and the query,
+        # so a client holding the current ETag gets a 304 before any ranking work
+        snapshot = get_snapshot(registry_for(districts))
+        validators = _top_districts_validators(snapshot, query, request.accepted_media_type)
+        not_modified = conditional_response(request, *validators)
+        if not_modified is not None:
+            return not_modified
+
+        # The default ranking is the same for every user until the next refresh, so its
+        # JSON body is rendered once per snapshot and written out as is
+        prerendered = request.accepted_media_type == "application/json" and _is_default_ranking(query)
+        body = snapshot.rendered.get(query["k"]) if prerendered else None
+        if body is None:
+            data = _top_districts_data(snapshot, query)
+            if not prerendered:
+                return with_validators(Response(data, status=status.HTTP_200_OK), *validators)
+            body = snapshot.rendered[query["k"]] = request.accepted_renderer.render(data, request.accepted_media_type)
+
+        response = HttpResponse(body, content_type=request.accepted_media_type, status=status.HTTP_200_OK)
+        return with_validators(response, *validators)
+
+
+def _top_districts_validators(snapshot, query, media_type):
+    """
+    ETag, Last-Modified and max-age of a top-districts response rendered as
+    `media_type`. Both validators cover the ranking and the district list, so a
+    new data.json invalidates If-Modified-Since as well as If-None-Match.
+    """
+    districts_version = get_districts_version()
+    etag = strong_etag(snapshot.version, districts_version, sorted(query.items()), media_type)
+    last_modified = max(snapshot.modified_at, districts_version or 0)
+    max_age = snapshot.built_at + settings.RANKING_REFRESH_INTERVAL - time.time()
+    return etag, last_modified, max_age
+
+
+def _is_default_ranking(query):
+    return not any(query.get(name) for name in ("start_date", "end_date", "weights"))
+
+
+def _top_districts_data(snapshot, query):
+    top_districts = get_top_districts(
+        result_range=query["k"],
+        start=query.get("start_date"),
+        end=query.get("end_date"),
+        weights=query.get("weights"),
+        snapshot=snapshot
+    )
+    with stage("serialization"):
+        return DistrictAirWeatherSerializer(top_districts, many=True).data
 
 
 @extend_schema(
@@ -49,7 +125,10 @@ class TopDistricts(APIView):
         OpenApiParameter(name='destination', type=str, required=True, location=OpenApiParameter.QUERY, description='Destination district name'),
         OpenApiParameter(name='lat', type=float, required=True, location=OpenApiParameter.QUERY, description='Latitude of source location'),
         OpenApiParameter(name='long', type=float, required=True, location=OpenApiParameter.QUERY, description='Longitude of source location'),
-        OpenApiParameter(name='date', type=str, required=True, location=OpenApiParameter.QUERY, description='Travel date (YYYY-MM-DD)')
+        OpenApiParameter(name='date', type=str, required=True, location=OpenApiParameter.QUERY, description='Travel date (YYYY-MM-DD)'),
+        OpenApiParameter(name='end_date', type=str, required=False, location=OpenApiParameter.QUERY, description='Last travel date (YYYY-MM-DD); compares every day from date to end_date and returns the best day'),
+        OpenApiParameter(name='source_mode', type=str, required=False, location=OpenApiParameter.QUERY, enum=['exact', 'nearest', 'interpolate'], description="'nearest' snaps the source to the closest district within the tolerance; 'interpolate' estimates it from the district forecasts"),
+        OpenApiParameter(name='snap_tolerance_km', type=float, required=False, location=OpenApiParameter.QUERY, description='Snap tolerance in km (default SOURCE_SNAP_TOLERANCE_KM)')
     ],
     responses={
         200: OpenApiExample(
@@ -72,7 +151,7 @@ class TopDistricts(APIView):
 )
 class TravelRecommendation(APIView):    
     def get(self, request):
-        serializer = TravelRecommendationQuerySerializer(data=request.query_params)
+        serializer = TravelRecommendationRangeQuerySerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
         validated_data = serializer.validated_data
 
@@ -90,23 +169,284 @@ class TravelRecommendation(APIView):
                 "details": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        district_info = next((d for d in districts if d["name"].lower() == destination.lower()), None)
+        registry = registry_for(districts)
+        district_info = registry.get(destination)
         if not district_info:
             return Response({
                 "success": False,
                 "message": f"Destination '{destination}' not found in district list."
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        travel_date = travel_date_str.strftime("%Y-%m-%d")
+        if validated_data.get("end_date"):
+            end_date = validated_data["end_date"].strftime("%Y-%m-%d")
+            source, options, source_info = _resolve_source(registry, validated_data, travel_date, end_date)
+            result = compare_weather_range(source, district_info, travel_date, end_date, **options)
+            if result["best"] is None:
+                return Response({
+                    "success": False,
+                    "message": f"No forecast available between {travel_date} and {end_date}."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            return Response(_range_recommendation(result, source_info), status=status.HTTP_200_OK)
+
+        source, options, source_info = _resolve_source(registry, validated_data, travel_date)
+
         result = compare_weather(
-            source={"lat": lat, "long": long},
-            destination={"lat": district_info.get("lat"), "long": district_info.get("long")},
-            date=travel_date_str.strftime("%Y-%m-%d")
+            source=source,
+            destination=district_info,
+            date=travel_date,
+            **options
         )
 
-        recommendation = "Recommended" if result["temp_diff"] < 0 and result["air_con_diff"] < 0 else "Not Recommended"
+        return Response(_recommendation(result, source_info), status=status.HTTP_200_OK)
+
+
+def _recommendation_label(result):
+    return "Recommended" if result["temp_diff"] < 0 and result["air_con_diff"] < 0 else "Not Recommended"
+
+
+def _recommendation(result, source_info=None):
+    response = {
+        "success": True,
+        "recommendation": _recommendation_label(result),
+        "message" : generate_weather_message(result)
+    }
+    if source_info:
+        response["source"] = source_info
+    return response
+
+
+def _date_range(start_date, end_date):
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    return [(start + timedelta(days=n)).isoformat() for n in range((end - start).days + 1)]
+
+
+def _range_recommendation(result, source_info=None):
+    days = []
+    for day, temp_diff, air_con_diff in zip(result["dates"], result["temp_diff"], result["air_con_diff"]):
+        if temp_diff != temp_diff or air_con_diff != air_con_diff:  # NaN: no forecast that day
+            days.append({"date": day, "recommendation": None, "temp_diff": None, "air_con_diff": None})
+            continue
+        comparison = {"temp_diff": float(temp_diff), "air_con_diff": float(air_con_diff)}
+        days.append({"date": day, "recommendation": _recommendation_label(comparison), **comparison})
+
+    best = days[result["best"]]
+    response = {
+        "success": True,
+        "recommendation": best["recommendation"],
+        "message": generate_weather_message(best),
+        "best_day": best["date"],
+        "days": days
+    }
+    if source_info:
+        response["source"] = source_info
+    return response
+
+
+def _resolve_source(registry, validated_data, travel_date, end_date=None):
+    """
+    Source location, extra compare_weather arguments and the `source` block of the
+    response for the requested source_mode; with `end_date`, the arguments of
+    compare_weather_range. Modes fall back to the exact coordinate
+    when the point is outside their tolerance.
+    """
+    lat, long, mode = validated_data["lat"], validated_data["long"], validated_data["source_mode"]
+    source = {"lat": lat, "long": long}
+
+    if mode == "nearest":
+        tolerance = validated_data.get("snap_tolerance_km", settings.SOURCE_SNAP_TOLERANCE_KM)
+        snapped = next(iter(registry.nearest(lat, long, k=1, max_km=tolerance)), None)
+        if snapped is None:
+            return source, {}, {"mode": "exact", "district": None, "distance_km": None}
+        district, distance = snapped
+        return district, {"source_is_district": True}, {
+            "mode": "nearest", "district": district["name"], "distance_km": round(distance, 2)
+        }
+
+    if mode == "interpolate":
+        if end_date is None:
+            field = get_field(registry, travel_date)
+            estimate = field.estimate(lat, long)
+            if estimate is None:
+                return source, {}, {"mode": "exact", "error_bound": None}
+            return source, {"source_values": estimate}, {"mode": "interpolate", "error_bound": field.error_bound}
+
+        # A range is interpolated only when every day is covered, with the widest daily bound
+        fields = [get_field(registry, d) for d in _date_range(travel_date, end_date)]
+        estimates = [field.estimate(lat, long) for field in fields]
+        if None in estimates:
+            return source, {}, {"mode": "exact", "error_bound": None}
+        error_bound = {name: max(f.error_bound[name] for f in fields) for name in fields[0].error_bound}
+        return source, {"source_values": estimates}, {"mode": "interpolate", "error_bound": error_bound}
+
+    return source, {}, None
+
+
+@extend_schema(
+    summary="Batch Travel Recommendation",
+    description=(
+        "Answers up to TRAVEL_BATCH_MAX_QUERIES travel recommendation queries in one call. "
+        "Queries are grouped by date and every location is fetched once, so the batch costs "
+        "a few multi-location upstream requests instead of two per query. Results keep the "
+        "order of the queries; a query that cannot be answered gets success=false."
+    ),
+    tags=["Travel"],
+    request=TravelRecommendationBatchSerializer,
+    responses={
+        200: OpenApiExample(
+            name="Batch Success",
+            value={
+                "success": True,
+                "results": [
+                    {"success": True, "recommendation": "Recommended", "message": "Weather is cooler and air quality is better in the destination."},
+                    {"success": False, "message": "Destination 'foobar' not found in district list."}
+                ]
+            }
+        ),
+        500: OpenApiExample(
+            name="Server Error",
+            value={"success": False, "message": "Unable to load district data."}
+        )
+    },
+)
+class TravelRecommendationBatch(APIView):
+    def post(self, request):
+        serializer = TravelRecommendationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queries = serializer.validated_data["queries"]
+
+        try:
+            districts = get_districts()
+        except Exception as e:
+            return Response({
+                "success": False,
+                "message": "Unable to load district data.",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        registry = registry_for(districts)
+        results = [None] * len(queries)
+        comparisons, pending = [], []
+        for i, query in enumerate(queries):
+            district_info = registry.get(query["destination"])
+            if not district_info:
+                results[i] = {
+                    "success": False,
+                    "message": f"Destination '{query['destination']}' not found in district list."
+                }
+                continue
+
+            travel_date = query["date"].strftime("%Y-%m-%d")
+            source, options, source_info = _resolve_source(registry, query, travel_date)
+            comparisons.append({"source": source, "destination": district_info, "date": travel_date, **options})
+            pending.append((i, travel_date, source_info))
+
+        for (i, travel_date, source_info), result in zip(pending, compare_weather_many(comparisons) if comparisons else []):
+            if result is None:
+                results[i] = {
+                    "success": False,
+                    "message": f"No forecast available for {travel_date} {COMPARISON_HOUR:02d}:00."
+                }
+            else:
+                results[i] = _recommendation(result, source_info)
+
+        return Response({"success": True, "results": results}, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    summary="District Autocomplete",
+    description="Suggests districts whose English, Bangla or alternative name starts with the given text.",
+    tags=["Travel"],
+    parameters=[
+        OpenApiParameter(name='q', type=str, required=True, location=OpenApiParameter.QUERY, description='Beginning of a district name'),
+        OpenApiParameter(name='limit', type=int, required=False, location=OpenApiParameter.QUERY, description='Maximum number of suggestions (default 10)')
+    ],
+    responses={200: DistrictSerializer(many=True)},
+)
+class DistrictAutocomplete(APIView):
+    def get(self, request):
+        serializer = DistrictAutocompleteQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            districts = get_districts()
+        except Exception as e:
+            return Response({
+                "success": False,
+                "message": "Unable to load district data.",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        etag = strong_etag(get_districts_version(), sorted(serializer.validated_data.items()), request.accepted_media_type)
+        not_modified = conditional_response(request, etag, get_districts_version())
+        if not_modified is not None:
+            return not_modified
+
+        matches = registry_for(districts).complete(serializer.validated_data["q"], serializer.validated_data["limit"])
+        response = Response(DistrictSerializer(matches, many=True).data, status=status.HTTP_200_OK)
+        return with_validators(response, etag, get_districts_version())
+
+
+@extend_schema(
+    summary="Nearest Districts",
+    description="Returns the districts closest to a coordinate, nearest first.",
+    tags=["Travel"],
+    parameters=[
+        OpenApiParameter(name='lat', type=float, required=True, location=OpenApiParameter.QUERY, description='Latitude of the point'),
+        OpenApiParameter(name='long', type=float, required=True, location=OpenApiParameter.QUERY, description='Longitude of the point'),
+        OpenApiParameter(name='k', type=int, required=False, location=OpenApiParameter.QUERY, description='Number of districts (default 3)')
+    ],
+    responses={200: NearestDistrictSerializer(many=True)},
+)
+class NearestDistricts(APIView):
+    def get(self, request):
+        serializer = NearestDistrictsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        validated_data = serializer.validated_data
+
+        try:
+            districts = get_districts()
+        except Exception as e:
+            return Response({
+                "success": False,
+                "message": "Unable to load district data.",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        etag = strong_etag(get_districts_version(), sorted(validated_data.items()), request.accepted_media_type)
+        not_modified = conditional_response(request, etag, get_districts_version())
+        if not_modified is not None:
+            return not_modified
+
+        nearest = registry_for(districts).nearest(validated_data["lat"], validated_data["long"], k=validated_data["k"])
+        data = [{**district, "distance_km": round(distance, 2)} for district, distance in nearest]
+        response = Response(NearestDistrictSerializer(data, many=True).data, status=status.HTTP_200_OK)
+        return with_validators(response, etag, get_districts_version())
+
+
+@extend_schema(
+    summary="Sampling Profiler",
+    description="Shows or changes the sampling profiler settings of all workers. Admin only.",
+    tags=["Observability"],
+    request=ProfilerControlSerializer,
+    responses={200: ProfilerControlSerializer},
+)
+class ProfilerControl(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(current_config(), status=status.HTTP_200_OK)
+
+    def post(self, request):
+        serializer = ProfilerControlSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(update_config(**serializer.validated_data), status=status.HTTP_200_OK)
+
 
-        return Response({
-            "success": True,
-            "recommendation": recommendation,
-            "message" : generate_weather_message(result)
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+def stage_metrics(request):
+    """Prometheus scrape target for the stage timing histograms of this worker."""
+    if not settings.METRICS_ENABLED:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+    if settings.METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,80 @@
+import time
+import threading
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing upstream after `failure_threshold` consecutive failures.
+    While open, calls fail fast; after `reset_timeout` seconds a single probe is let
+    through and its outcome closes or re-opens the circuit.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self):
+        return self._state
+
+    def retry_after(self):
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def available(self):
+        # Non-consuming check: False while open and the reset timeout has not elapsed
+        return self._state == self.CLOSED or (self._state == self.OPEN and not self.retry_after())
+
+    def allow_request(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and not self.retry_after():
+                # Let exactly one probe through
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    async def call(self, func, is_failure=lambda e: True):
+        if not self.allow_request():
+            raise CircuitOpenError(
+                f"Upstream unavailable, retrying in {self.retry_after():.0f}s."
+            )
+        try:
+            result = await func()
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # A cancelled probe must not leave the circuit half-open for good
+            with self._lock:
+                if self._state == self.HALF_OPEN:
+                    self._state = self.OPEN
+            raise
+        self.record_success()
+        return result
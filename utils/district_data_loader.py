@@ -1,54 +1,183 @@
 import os
 import json
-import subprocess
+import time
+import logging
+import threading
+import requests
 from django.conf import settings
 from rest_framework.exceptions import APIException
 
-_path = os.path.join(settings.BASE_DIR, 'data.json')
+from utils.timing import stage
+from utils.shared_files import write_atomic, file_mtime, PollInterval
+
+
+logger = logging.getLogger(__name__)
+
+# How often a worker stats data.json for a newer version
+_disk_poll = PollInterval(seconds=1.0)
+
 _districts = None
+_districts_mtime = None
 _districts_error = None
+_failed_at = 0.0
+_load_lock = threading.Lock()
 
-def load_districts():
-    global _districts, _districts_error
 
-    # If already loaded or failed, skip reloading
-    if _districts or _districts_error:
-        return
+def _validate(data):
+    if not isinstance(data.get('districts'), list):
+        raise ValueError("data.json does not contain a list.")
+    if not data['districts'] or not isinstance(data['districts'][0], dict):
+        raise ValueError("Each district should be a dictionary.")
+
+
+def _meta_path(path):
+    return f"{path}.meta.json"
+
+
+def _read_meta(path, url):
+    # Validators are only reused for the same URL and while the data file still exists
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(_meta_path(path), 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return meta if meta.get('url') == url else {}
+
+
+def fetch_district_data(url=None, path=None, retries=None, backoff=None):
+    """
+    Downloads the district list with retries and exponential backoff and writes it
+    to `path` through a temp file, so readers never see a partial file. The request
+    is conditional on the ETag/Last-Modified of the previous download; returns None
+    when the server reports the data unchanged.
+    """
+    url = url or settings.DISTRICT_DATA_URL
+    path = path or settings.DISTRICT_DATA_PATH
+    retries = settings.DISTRICT_FETCH_RETRIES if retries is None else retries
+    backoff = settings.DISTRICT_FETCH_BACKOFF if backoff is None else backoff
+    if not url:
+        raise RuntimeError("DISTRICT_DATA_URL is not set.")
 
-    if not os.path.exists(_path):
+    meta = _read_meta(path, url)
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    for attempt in range(retries + 1):
         try:
-            result = subprocess.run(
-                ['python', 'manage.py', 'fetch_json'],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-        except subprocess.CalledProcessError as e:
-            _districts_error = RuntimeError(
-                f"Fetch failed:\n{e.stdout}\n{e.stderr}"
-            )
-            return
+            response = requests.get(url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            data = response.json()
+            _validate(data)
+            break
+        except (requests.RequestException, ValueError) as e:
+            if attempt == retries:
+                raise RuntimeError(f"Fetching district data failed after {attempt + 1} attempts: {e}") from e
+            delay = backoff * 2 ** attempt
+            logger.warning(f"Fetching district data failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    write_atomic(path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    write_atomic(_meta_path(path), json.dumps({
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }))
+    return data
+
+
+def _read(path):
+    mtime = os.stat(path).st_mtime
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    _validate(data)
+    return data, mtime
+
+
+def _reload_if_changed():
+    """
+    Picks up a replaced data.json with at most one stat per poll interval. The new
+    list is swapped in by a single assignment, so readers never take a lock.
+    """
+    global _districts, _districts_mtime
 
-    if not os.path.exists(_path):
-        _districts_error = FileNotFoundError("data.json still missing after fetch attempt.")
+    if not _disk_poll.due():
+        return
+
+    path = settings.DISTRICT_DATA_PATH
+    mtime = file_mtime(path)
+    if mtime is None or mtime == _districts_mtime:
         return
 
     try:
-        with open(_path, 'r') as f:
-            _districts = json.load(f)
+        data, mtime = _read(path)
+    except (OSError, ValueError) as e:
+        # Keep serving the previous list; the next replacement is picked up again
+        logger.warning(f"Ignoring unreadable district data: {e}")
+        _districts_mtime = mtime
+        return
+    _districts, _districts_mtime = data, mtime
+
+
+def load_districts():
+    global _districts, _districts_mtime, _districts_error, _failed_at
 
-            if not isinstance(_districts['districts'], list):
-                raise ValueError("data.json does not contain a list.")
-            if not isinstance(_districts['districts'][0], dict):
-                raise ValueError("Each district should be a dictionary.")
-    except json.JSONDecodeError as e:
-        _districts_error = ValueError(f"Invalid JSON in data.json: {e}")
+    if _districts:
+        _reload_if_changed()
+        return
+
+    with _load_lock:
+        # Already loaded, or failed recently enough that retrying now would only add latency
+        if _districts or (_districts_error and time.monotonic() - _failed_at < settings.DISTRICT_RETRY_AFTER):
+            return
+
+        path = settings.DISTRICT_DATA_PATH
+        try:
+            if not os.path.exists(path):
+                fetch_district_data(path=path)
+            data, mtime = _read(path)
+        except json.JSONDecodeError as e:
+            _districts_error = ValueError(f"Invalid JSON in data.json: {e}")
+        except Exception as e:
+            _districts_error = e
+        else:
+            _districts, _districts_mtime, _districts_error = data, mtime, None
+            return
+        _failed_at = time.monotonic()
+        logger.error(f"Loading district data failed: {_districts_error}")
+
+
+def warm_up():
+    """
+    Loads the district list in a background thread when a server process starts
+    (config/wsgi.py, config/asgi.py) and DISTRICT_WARMUP is on, so the first
+    request finds it in memory instead of fetching it.
+    """
+    if not settings.DISTRICT_WARMUP:
+        return
+    threading.Thread(target=load_districts, name="district-warm-up", daemon=True).start()
 
 
 def get_districts():
-    load_districts()
+    with stage("district_loading"):
+        load_districts()
 
-    if _districts_error:
+    if _districts is None:
         raise APIException(detail=_districts_error)
-    return _districts['districts']
\ No newline at end of file
+    return _districts['districts']
+
+
+def districts_loaded():
+    """True once the list is in memory, so get_districts() only polls data.json for changes."""
+    return _districts is not None
+
+
+def get_districts_version():
+    """Modification time of the loaded data.json; changes whenever a new list is swapped in."""
+    return _districts_mtime
@@ -0,0 +1,117 @@
+import unicodedata
+import numpy as np
+from functools import cached_property
+
+from utils.district_data_loader import get_districts
+from utils.spatial_index import GridIndex
+
+
+# Spellings that name the same district. Any member that is a district name in
+# the source data makes the others resolve to it (official 2018 renames and
+# common transliterations).
+ALIASES = (
+    ("Chattogram", "Chittagong"),
+    ("Cumilla", "Comilla"),
+    ("Barishal", "Barisal"),
+    ("Jashore", "Jessore"),
+    ("Bogura", "Bogra"),
+    ("Chapainawabganj", "Chapai Nawabganj", "Nawabganj"),
+    ("Jhalokati", "Jhalakathi", "Jhalokathi"),
+    ("Moulvibazar", "Maulvibazar"),
+    ("Netrokona", "Netrakona"),
+    ("Cox's Bazar", "Coxsbazar", "Coxs Bazar"),
+    ("Brahmanbaria", "Brahmanbariya"),
+    ("Narsingdi", "Narshingdi"),
+)
+
+
+def normalize_name(name):
+    """Case-, width- and punctuation-insensitive key: "Cox's  Bazar" -> "coxsbazar"."""
+    name = unicodedata.normalize("NFKC", str(name)).casefold()
+    # Keep letters, digits and combining marks (Bangla vowel signs are marks)
+    return "".join(c for c in name if unicodedata.category(c)[0] in "LNM")
+
+
+class DistrictRegistry:
+    """
+    Read-only index over one loaded district list, built once per list: an exact
+    lookup on normalized English, Bangla and alternative names, a prefix index for
+    autocomplete, and the coordinates prebuilt for upstream request parameters.
+    Behaves as the sequence of district dicts it was built from.
+    """
+    def __init__(self, districts):
+        self.source = districts
+        self.districts = list(districts)
+        for d in self.districts:
+            if not isinstance(d, dict) or not all(k in d for k in ("name", "lat", "long")):
+                raise ValueError("Each district must contain 'name', 'lat', and 'long'.")
+
+        self.latitudes = [d["lat"] for d in self.districts]
+        self.longitudes = [d["long"] for d in self.districts]
+        self.lat_array = np.array(self.latitudes, dtype=np.float64)
+        self.long_array = np.array(self.longitudes, dtype=np.float64)
+
+        self._by_name = {}
+        for i, d in enumerate(self.districts):
+            for name in (d["name"], d.get("bn_name"), *d.get("aliases", ())):
+                if name:
+                    self._by_name.setdefault(normalize_name(name), i)
+        for group in ALIASES:
+            index = next((self._by_name[k] for k in map(normalize_name, group) if k in self._by_name), None)
+            if index is not None:
+                for key in map(normalize_name, group):
+                    self._by_name.setdefault(key, index)
+
+        # Prefix -> district indices in name order
+        by_name_order = sorted(range(len(self.districts)), key=lambda i: self.districts[i]["name"])
+        rank = {index: position for position, index in enumerate(by_name_order)}
+        prefixes = {}
+        for key, index in self._by_name.items():
+            for end in range(1, len(key) + 1):
+                prefixes.setdefault(key[:end], set()).add(index)
+        self._prefixes = {prefix: tuple(sorted(indices, key=rank.get)) for prefix, indices in prefixes.items()}
+
+    def __len__(self):
+        return len(self.districts)
+
+    def __iter__(self):
+        return iter(self.districts)
+
+    def __getitem__(self, index):
+        return self.districts[index]
+
+    @cached_property
+    def spatial(self):
+        return GridIndex(self.lat_array, self.long_array)
+
+    def nearest(self, lat, long, k=1, max_km=None):
+        """Up to `k` (district, distance_km) pairs closest to the point, nearest first."""
+        indices, distances = self.spatial.nearest(lat, long, k=k, max_km=max_km)
+        return [(self.districts[i], float(d)) for i, d in zip(indices, distances)]
+
+    def get(self, name):
+        index = self._by_name.get(normalize_name(name))
+        return None if index is None else self.districts[index]
+
+    def complete(self, prefix, limit=10):
+        key = normalize_name(prefix)
+        if not key:
+            return []
+        return [self.districts[i] for i in self._prefixes.get(key, ())[:limit]]
+
+
+_registry = None
+
+
+def registry_for(districts):
+    """Registry of `districts`, rebuilt only when a different list is passed (e.g. after a reload)."""
+    global _registry
+
+    registry = _registry
+    if registry is None or registry.source is not districts:
+        registry = _registry = DistrictRegistry(districts)
+    return registry
+
+
+def get_registry():
+    return registry_for(get_districts())
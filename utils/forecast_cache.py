@@ -0,0 +1,68 @@
+import time
+from urllib.parse import urlencode
+from requests_cache.backends.sqlite import SQLiteDict
+
+
+def split_payload(data):
+    """
+    Splits a multi-location Open-Meteo flatbuffer payload into one
+    length-prefixed message per location, in request order.
+    """
+    messages = []
+    pos = 0
+    while pos < len(data):
+        length = int.from_bytes(data[pos:pos + 4], byteorder="little")
+        messages.append(data[pos:pos + 4 + length])
+        pos += length + 4
+    return messages
+
+
+class LocationForecastCache:
+    """
+    Open-Meteo responses cached per (latitude, longitude, variable, date window)
+    instead of per URL, so batch and single-location requests share entries.
+    Entries stay fresh for `expire_after` seconds and may be served stale for
+    `stale_ttl` seconds after that while they are refreshed.
+    """
+    def __init__(self, storage, expire_after, stale_ttl=0):
+        self.storage = storage
+        self.expire_after = expire_after
+        self.stale_ttl = stale_ttl
+
+    @staticmethod
+    def key(url, lat, long, window):
+        # `window` holds every non-location parameter: variable, timezone and date range
+        return f"{url}|{float(lat):.4f},{float(long):.4f}|{urlencode(sorted(window.items()))}"
+
+    def get(self, key):
+        entry = self.storage.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        return None
+
+    def lookup(self, key):
+        """
+        Returns (payload, is_fresh). The payload is None once the entry is past
+        its stale window as well.
+        """
+        entry = self.storage.get(key)
+        now = time.time()
+        if not entry or entry[0] + self.stale_ttl <= now:
+            return None, False
+        return entry[1], entry[0] > now
+
+    def set(self, key, payload):
+        self.storage[key] = (time.time() + self.expire_after, payload)
+
+    def purge_expired(self):
+        now = time.time()
+        expired = [key for key, entry in self.storage.items() if entry[0] + self.stale_ttl <= now]
+        if expired:
+            self.storage.bulk_delete(keys=expired)
+        return len(expired)
+
+
+def sqlite_location_cache(expire_after, stale_ttl=0):
+    # Shares the .cache SQLite file across workers, in a table of its own. Writes land on the
+    # client's event loop; WAL keeps each commit short and lets other workers read meanwhile.
+    return LocationForecastCache(SQLiteDict('.cache', table_name='openmeteo_locations', wal=True), expire_after, stale_ttl)
@@ -0,0 +1,112 @@
+import time
+import threading
+import numpy as np
+from django.conf import settings
+
+from utils.spatial_index import haversine_km
+from utils.openmateo_client import get_district_values_at
+
+
+# Neighbours and distance power of the inverse-distance weighting
+NEIGHBOURS = 6
+POWER = 2.0
+VARIABLES = ("temperature_2m", "pm2_5")
+
+_fields = {}
+_fields_lock = threading.Lock()
+
+
+class ForecastField:
+    """
+    Temperature and PM2.5 at one local hour over Bangladesh, interpolated by
+    inverse-distance weighting of the district forecasts. The error bound is the
+    95th percentile of the leave-one-out error: each district predicted from the
+    others and compared with its upstream value.
+    """
+    def __init__(self, lats, longs, values, max_km):
+        valid = ~np.isnan(values).any(axis=1)
+        self.lats = np.asarray(lats, dtype=np.float64)[valid]
+        self.longs = np.asarray(longs, dtype=np.float64)[valid]
+        self.values = np.asarray(values, dtype=np.float64)[valid]
+        self.max_km = max_km
+        self.error_bound = self._leave_one_out_error()
+
+    @property
+    def available(self):
+        return len(self.values) > NEIGHBOURS
+
+    def _weights(self, distances, exclude_self=False):
+        # distances: (points, districts). Keep the nearest neighbours of each point.
+        if exclude_self:
+            distances = np.where(distances == 0, np.inf, distances)
+        k = min(NEIGHBOURS, distances.shape[1] - exclude_self)
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / nearest_distances ** POWER
+        # A point on a district takes its value exactly
+        on_point = np.isinf(weights)
+        weights = np.where(on_point.any(axis=1, keepdims=True), on_point.astype(float), weights)
+        return nearest, weights / weights.sum(axis=1, keepdims=True), nearest_distances.min(axis=1)
+
+    def _leave_one_out_error(self):
+        if not self.available:
+            return {name: None for name in VARIABLES}
+        distances = haversine_km(self.lats[:, None], self.longs[:, None], self.lats[None, :], self.longs[None, :])
+        nearest, weights, _ = self._weights(distances, exclude_self=True)
+        predicted = np.einsum("pk,pkv->pv", weights, self.values[nearest])
+        errors = np.abs(predicted - self.values)
+        return {name: float(np.percentile(errors[:, i], 95)) for i, name in enumerate(VARIABLES)}
+
+    def estimate_many(self, lats, longs):
+        """
+        (points, 2) array of temperature and PM2.5; rows are NaN for points farther
+        than `max_km` from every district, where interpolation is not trusted.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        longs = np.atleast_1d(np.asarray(longs, dtype=np.float64))
+        distances = haversine_km(lats[:, None], longs[:, None], self.lats[None, :], self.longs[None, :])
+        nearest, weights, closest = self._weights(distances)
+        estimates = np.einsum("pk,pkv->pv", weights, self.values[nearest])
+        estimates[closest > self.max_km] = np.nan
+        return estimates
+
+    def estimate(self, lat, long):
+        """(temperature, pm2_5) at a point, or None outside the covered area."""
+        if not self.available:
+            return None
+        temperature, pm2_5 = self.estimate_many([lat], [long])[0]
+        return None if np.isnan(temperature) else (float(temperature), float(pm2_5))
+
+
+def build_field(registry, date):
+    temperatures, pm2_5 = get_district_values_at(registry, date)
+    return ForecastField(
+        registry.lat_array, registry.long_array,
+        np.column_stack((temperatures, pm2_5)),
+        max_km=settings.FORECAST_FIELD_MAX_KM
+    )
+
+
+def get_field(registry, date):
+    """
+    Field of `date` for the districts of `registry`, built from the cached district
+    forecasts and kept for FORECAST_FIELD_TTL seconds.
+    """
+    key = (id(registry.source), date)
+    now = time.monotonic()
+    entry = _fields.get(key)
+    if entry is not None and entry[0] is registry.source and now - entry[1] < settings.FORECAST_FIELD_TTL:
+        return entry[2]
+
+    with _fields_lock:
+        entry = _fields.get(key)
+        if entry is not None and entry[0] is registry.source and now - entry[1] < settings.FORECAST_FIELD_TTL:
+            return entry[2]
+        field = build_field(registry, date)
+        # Expired fields and fields of a replaced district list are dropped here
+        for stale_key, (source, built_at, _) in list(_fields.items()):
+            if source is not registry.source or now - built_at >= settings.FORECAST_FIELD_TTL:
+                del _fields[stale_key]
+        _fields[key] = (registry.source, now, field)
+        return field
@@ -0,0 +1,43 @@
+import hashlib
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+def strong_etag(*parts):
+    """
+    Strong ETag over the versions a response is derived from (data digests, query,
+    negotiated media type, ...).
+    """
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def with_validators(response, etag, last_modified=None, max_age=0):
+    """
+    Adds ETag, Last-Modified and Cache-Control to `response`. Responses are only
+    served to authenticated users, so only the client may cache them; without a
+    `max_age` it must revalidate every time, which is cheap through the ETag.
+    The body depends on the negotiated renderer, so responses vary on Accept.
+    """
+    response["ETag"] = etag
+    patch_vary_headers(response, ("Accept",))
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    if max_age > 0:
+        patch_cache_control(response, private=True, max_age=int(max_age))
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, etag, last_modified=None, max_age=0):
+    """
+    `304 Not Modified` (or `412 Precondition Failed`) when the request's
+    If-None-Match / If-Modified-Since / If-Match headers allow it, otherwise None.
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified) if last_modified is not None else None
+    )
+    if response is None:
+        return None
+    return with_validators(response, etag, last_modified, max_age)
@@ -1,167 +1,787 @@
-import datetime
-import logging
-import pandas as pd
+import os
 import ast
-import openmeteo_requests
-import requests_cache
-from retry_requests import retry
+import asyncio
+import logging
+import calendar
+import datetime
+import threading
+import aiohttp
+import numpy as np
+from zoneinfo import ZoneInfo
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+from openmeteo_requests.Client import OpenMeteoRequestsError
+from django.conf import settings
 from rest_framework.exceptions import APIException
 
+from utils.circuit_breaker import CircuitBreaker
+from utils.district_registry import DistrictRegistry
+from utils.forecast_cache import sqlite_location_cache, split_payload
+from utils.ranking_engine import RankingEngine
+from utils.single_flight import SingleFlight, worker_lock
+from utils.timing import stage
+
 
 logger = logging.getLogger(__name__)
 
-# Setting up Open-Meteo client with retry + caching
-cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-openmeteo_client = openmeteo_requests.Client(session=retry_session)
+WEATHER_URL = settings.OPENMETEO_WEATHER_URL
+AIR_URL = settings.OPENMETEO_AIR_URL
+
+TIMEZONE = "Asia/Dhaka"
+DISTRICT_FORECAST_DAYS = 7
+
+# Seconds past midnight (UTC) of the 2 PM sample used for the ranking
+_TWO_PM_SECONDS = 14 * 3600
+_DAY_SECONDS = 24 * 3600
+# The same sample in local time (Asia/Dhaka is UTC+6 all year)
+RANKING_LOCAL_HOUR = 20
+# Local hour compared by compare_weather
+COMPARISON_HOUR = 13
+
+CACHE_EXPIRE_AFTER = 3600
+RETRIES = 5
+BACKOFF_FACTOR = 0.2
+RETRY_STATUSES = (500, 502, 504)
+POOL_SIZE = settings.OPENMETEO_POOL_SIZE
+REQUEST_TIMEOUT = 10
+
+# Per-location flatbuffer payloads, shared by every worker through the same SQLite file
+location_cache = sqlite_location_cache(
+    expire_after=CACHE_EXPIRE_AFTER,
+    stale_ttl=settings.OPENMETEO_STALE_TTL
+)
+upstream_flights = SingleFlight()
+
+# One circuit per upstream host
+_breakers = {}
+
+
+def breaker_for(url):
+    return _breakers.setdefault(url, CircuitBreaker(
+        failure_threshold=settings.OPENMETEO_BREAKER_FAILURES,
+        reset_timeout=settings.OPENMETEO_BREAKER_RESET_TIMEOUT
+    ))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when retries would run past a request's time budget."""
+
+
+class AsyncOpenMeteoClient:
+    """
+    Open-Meteo client built on aiohttp. A pooled session is kept for the event loop
+    it runs on, so concurrent requests reuse keep-alive connections to the upstream hosts.
+    """
+    def __init__(self, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+        self._session_loop = None
+        self._background_tasks = set()
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session_loop = loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    @staticmethod
+    def _encode_params(params):
+        # Open-Meteo takes multiple locations as comma separated lists
+        encoded = {"format": "flatbuffers"}
+        for key, value in params.items():
+            encoded[key] = ",".join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+        return encoded
+
+    @staticmethod
+    def _decode(payload):
+        # Cached payloads hold a single length-prefixed message
+        return WeatherApiResponse.GetRootAs(payload, 4)
+
+    async def _attempt(self, session, url, params):
+        async with session.get(url, params=params) as response:
+            if response.status in (400, 429):
+                raise OpenMeteoRequestsError(await response.json(content_type=None))
+            response.raise_for_status()
+            return await response.read()
+
+    async def _hedged_attempt(self, session, url, params):
+        """
+        One attempt, duplicated after OPENMETEO_HEDGE_DELAY seconds if the first
+        request has not answered yet. The first successful answer wins.
+        """
+        tasks = {asyncio.ensure_future(self._attempt(session, url, params))}
+        delay = settings.OPENMETEO_HEDGE_DELAY
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay or None)
+            if not done:
+                tasks.add(asyncio.ensure_future(self._attempt(session, url, params)))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _download(self, url, params, deadline):
+        """
+        GET with retries on transport errors and 5xx, bounded by `deadline`
+        (event loop time): no attempt or backoff runs past it.
+        """
+        session = self._get_session()
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(RETRIES + 1):
+            try:
+                return await asyncio.wait_for(
+                    self._hedged_attempt(session, url, params),
+                    timeout=max(0.0, deadline - loop.time())
+                )
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or attempt == RETRIES:
+                    raise
+                error = e
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == RETRIES:
+                    raise
+                error = e
+
+            backoff = BACKOFF_FACTOR * (2 ** attempt)
+            if loop.time() + backoff >= deadline:
+                raise DeadlineExceeded(f"No answer from {url} within the request deadline: {error!r}")
+            await asyncio.sleep(backoff)
+
+    async def _fetch_missing(self, url, window, locations, deadline):
+        """
+        Downloads `locations` ({cache key: (lat, long)}) in one batch request.
+        Entries another worker stored while we waited for the lock are reused.
+        """
+        lock_key = f"{url}|{'|'.join(locations)}"
+        async with worker_lock(settings.OPENMETEO_LOCK_DIR, lock_key):
+            payloads = {key: location_cache.get(key) for key in locations}
+            missing = [key for key, payload in payloads.items() if payload is None]
+            if not missing:
+                return payloads
+
+            batch = {
+                **window,
+                "latitude": [locations[key][0] for key in missing],
+                "longitude": [locations[key][1] for key in missing],
+            }
+            # Only transport errors and 5xx count against the circuit; a 400/429 body
+            # is the upstream answering coherently.
+            data = await breaker_for(url).call(
+                lambda: self._download(url, self._encode_params(batch), deadline),
+                is_failure=lambda e: not isinstance(e, OpenMeteoRequestsError)
+            )
+            messages = split_payload(data)
+            if len(messages) != len(missing):
+                raise OpenMeteoRequestsError(
+                    {"error": True, "reason": f"Expected {len(missing)} locations, got {len(messages)}."}
+                )
+            for key, payload in zip(missing, messages):
+                location_cache.set(key, payload)
+                payloads[key] = payload
+            return payloads
+
+    def _refresh_in_background(self, url, window, locations):
+        if not breaker_for(url).available():
+            return
+
+        async def refresh():
+            deadline = asyncio.get_running_loop().time() + settings.OPENMETEO_REQUEST_DEADLINE
+            try:
+                await upstream_flights.do(
+                    (url, tuple(locations)),
+                    lambda: self._fetch_missing(url, window, locations, deadline)
+                )
+            except Exception as e:
+                logger.warning(f"Background refresh of {len(locations)} locations failed: {e}")
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def weather_api(self, url, params, budget=None, serve_stale=None):
+        """
+        Decoded responses of every location in `params`. Stale cache entries are
+        answered right away unless `serve_stale` (default OPENMETEO_SERVE_STALE) is off.
+        """
+        serve_stale = settings.OPENMETEO_SERVE_STALE if serve_stale is None else serve_stale
+        deadline = asyncio.get_running_loop().time() + (budget or settings.OPENMETEO_REQUEST_DEADLINE)
+        latitudes = params["latitude"] if isinstance(params["latitude"], (list, tuple)) else [params["latitude"]]
+        longitudes = params["longitude"] if isinstance(params["longitude"], (list, tuple)) else [params["longitude"]]
+        window = {k: v for k, v in params.items() if k not in ("latitude", "longitude")}
+
+        payloads = {}
+        missing = {}
+        stale = {}
+        keys = [location_cache.key(url, lat, long, window) for lat, long in zip(latitudes, longitudes)]
+        for key, lat, long in zip(keys, latitudes, longitudes):
+            payload, fresh = location_cache.lookup(key)
+            if fresh or (payload is not None and serve_stale):
+                payloads[key] = payload
+                if not fresh:
+                    stale[key] = (lat, long)
+            else:
+                missing[key] = (lat, long)
+
+        # Stale entries are answered right away and refreshed behind the response
+        if stale:
+            self._refresh_in_background(url, window, stale)
+
+        # Only locations without a usable entry go upstream, as a single batch.
+        # Identical in-flight batches share one upstream call.
+        if missing:
+            payloads.update(await upstream_flights.do(
+                (url, tuple(missing)),
+                lambda: self._fetch_missing(url, window, missing, deadline)
+            ))
+
+        return [self._decode(payloads[key]) for key in keys]
+
+    async def weather_api_many(self, *requests, serve_stale=None):
+        return await asyncio.gather(*(
+            self.weather_api(url, params, serve_stale=serve_stale) for url, params in requests
+        ))
+
+
+# Upstream I/O runs on one background event loop per process. Sync callers
+# submit coroutines to it, so the connection pool outlives individual requests.
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+async_client = AsyncOpenMeteoClient()
+
+
+def _client_loop():
+    global _loop, _loop_pid
+
+    with _loop_lock:
+        # A loop inherited through fork() has no thread running it
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="openmeteo-client", daemon=True).start()
+    return _loop
+
+
+def run_sync(coro):
+    with stage("upstream_fetch"):
+        return asyncio.run_coroutine_threadsafe(coro, _client_loop()).result()
+
+
+def weather_api(url, params, serve_stale=None):
+    return run_sync(async_client.weather_api(url, params, serve_stale=serve_stale))
+
+
+def weather_api_many(*requests, serve_stale=None):
+    return run_sync(async_client.weather_api_many(*requests, serve_stale=serve_stale))
+
+
+async def run_async(coro):
+    """Awaits `coro` on the client loop without blocking the caller's event loop."""
+    with stage("upstream_fetch"):
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _client_loop()))
+
+
+async def aweather_api_many(*requests):
+    return await run_async(async_client.weather_api_many(*requests))
+
+
+# A fetch plan is a generator that yields lists of (url, params) requests and is sent
+# their responses, or has the fetch error thrown in; it returns its result. Plans keep
+# the request/response logic in one place for sync views and for async views.
+def _run_plan(plan):
+    try:
+        requests = next(plan)
+        while True:
+            try:
+                responses = weather_api_many(*requests)
+            except Exception as e:
+                requests = plan.throw(e)
+            else:
+                requests = plan.send(responses)
+    except StopIteration as done:
+        return done.value
+
+
+async def _arun_plan(plan):
+    try:
+        requests = next(plan)
+        while True:
+            try:
+                responses = await aweather_api_many(*requests)
+            except Exception as e:
+                requests = plan.throw(e)
+            else:
+                requests = plan.send(responses)
+    except StopIteration as done:
+        return done.value
+
+
+def _raise_api_exception(e):
+    try:
+        raise APIException(detail=ast.literal_eval(str(e)))
+    except Exception:
+        raise APIException(detail={"error": True, "reason": str(e)})
 
 
 # Validating district list and it's attributes
 def _validate_districts(districts):
+    if isinstance(districts, DistrictRegistry):
+        return  # validated once when the registry was built
     if not isinstance(districts, list) or not all(isinstance(d, dict) for d in districts):
         raise ValueError("Districts must be a list of dictionaries.")
     for d in districts:
         if not all(k in d for k in ("name", "lat", "long")):
             raise ValueError("Each district must contain 'name', 'lat', and 'long'.")
-        
 
-def _fetch_hourly_data(url, districts, hourly_param, forecast_days=None):
-    _validate_districts(districts)
 
-    params = {
-        "latitude": [d["lat"] for d in districts],
-        "longitude": [d["long"] for d in districts],
+def _location_params(locations, hourly_param, window):
+    if isinstance(locations, DistrictRegistry):
+        latitudes, longitudes = locations.latitudes, locations.longitudes
+    else:
+        latitudes = [loc["lat"] for loc in locations]
+        longitudes = [loc["long"] for loc in locations]
+    return {
+        "latitude": latitudes,
+        "longitude": longitudes,
         "hourly": hourly_param,
-        "timezone": "Asia/Dhaka"
+        "timezone": TIMEZONE,
+        **window
+    }
+
+
+def _local_today():
+    return datetime.datetime.now(ZoneInfo(TIMEZONE)).date()
+
+
+def _district_window():
+    """
+    Local hour span of the district forecasts. It starts at the 13:00 comparison
+    hour on the first day and ends at the last 2 PM (UTC) ranking sample, so no
+    hour we never read is downloaded at either end.
+    """
+    today = _local_today()
+    last_day = today + datetime.timedelta(days=DISTRICT_FORECAST_DAYS - 1)
+    return {
+        "start_hour": f"{today.isoformat()}T{COMPARISON_HOUR:02d}:00",
+        "end_hour": f"{last_day.isoformat()}T{RANKING_LOCAL_HOUR:02d}:00"
     }
 
-    if forecast_days:
-        params["forecast_days"] = forecast_days
 
+def _hour_window(date):
+    # A single local hour: the only sample compare_weather reads for that date
+    hour = f"{date}T{COMPARISON_HOUR:02d}:00"
+    return {"start_hour": hour, "end_hour": hour}
+
+
+# District-wide forecast requests. Any caller using these windows shares
+# per-location cache entries with the top-districts ranking.
+def _district_weather_request(locations):
+    return WEATHER_URL, _location_params(locations, "temperature_2m", _district_window())
+
+
+def _district_air_request(locations):
+    return AIR_URL, _location_params(locations, "pm2_5", _district_window())
+
+
+def _fetch_hourly_data(url, params):
     try:
-        return openmeteo_client.weather_api(url, params=params)
+        return weather_api(url, params)
     except Exception as e:
-        logger.error(f"Error fetching {hourly_param} data: {str(e)}", exc_info=True)
-        try:
-            raise APIException(detail=ast.literal_eval(str(e)))
-        except Exception:
-            raise APIException(detail={"error": True, "reason": str(e)})
-        
+        logger.error(f"Error fetching {params['hourly']} data: {str(e)}", exc_info=True)
+        _raise_api_exception(e)
+
+
+def _two_pm_slice(hourly):
+    times = np.arange(hourly.Time(), hourly.TimeEnd(), hourly.Interval(), dtype=np.int64)
+    matches = np.flatnonzero(times % _DAY_SECONDS == _TWO_PM_SECONDS)
+    if not len(matches):
+        return times, slice(0, 0)
+    # Samples are evenly spaced, so every 2 PM value sits one day's stride after the first
+    return times, slice(matches[0], None, _DAY_SECONDS // hourly.Interval())
+
+
+def _two_pm_values(response):
+    """
+    2 PM samples of a batch response as (times, values): the UTC seconds of each
+    sample and a (locations, days) array of the requested variable.
+    """
+    # All locations of one batch request share the same time axis,
+    # so the 2 PM positions are computed once and reused for every district.
+    with stage("decode"):
+        times, two_pm = _two_pm_slice(response[0].Hourly())
+        values = np.stack([res.Hourly().Variables(0).ValuesAsNumpy()[two_pm] for res in response])
+    return times[two_pm], values
+
 
 def _process_hourly_response(response, districts, param_key):
-    data_list = []
-
-    for i, res in enumerate(response):
-        district = districts[i]
-        hourly = res.Hourly()
-        values = hourly.Variables(0).ValuesAsNumpy()
-        times = pd.date_range(
-            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=hourly.Interval()),
-            inclusive="left"
-        )
+    """Long-format DataFrame of the 2 PM samples. Needs pandas, which is imported on demand."""
+    import pandas as pd
 
-        df = pd.DataFrame({
-            "date": times,
-            param_key: values,
-            "district_name": district["name"],
-            "lat": district["lat"],
-            "long": district["long"]
-        })
+    times, values = _two_pm_values(response)
+    n_districts, n_days = values.shape
+    dates = pd.to_datetime(times, unit="s", utc=True)
 
-        df_2pm = df[df["date"].dt.time == datetime.time(14, 0)]
-        data_list.append(df_2pm)
+    def per_row(key):
+        return np.repeat(np.array([d[key] for d in districts], dtype=object), n_days)
 
-    return pd.concat(data_list, ignore_index=True)
+    return pd.DataFrame({
+        "date": dates[np.tile(np.arange(n_days), n_districts)],
+        param_key: values.ravel(),
+        "district_name": per_row("name"),
+        "lat": per_row("lat"),
+        "long": per_row("long")
+    })
 
 
 def get_batch_weather_info(districts):
-    weather_url = "https://api.open-meteo.com/v1/forecast"
-    response = _fetch_hourly_data(weather_url, districts, hourly_param="temperature_2m")
+    _validate_districts(districts)
+    response = _fetch_hourly_data(*_district_weather_request(districts))
     return _process_hourly_response(response, districts, param_key="temperature_2m")
 
 
 def get_batch_air_info(districts):
-    air_url = "https://air-quality-api.open-meteo.com/v1/air-quality"
-    response = _fetch_hourly_data(air_url, districts, hourly_param="pm2_5", forecast_days=7)
+    _validate_districts(districts)
+    response = _fetch_hourly_data(*_district_air_request(districts))
     return _process_hourly_response(response, districts, param_key="pm2_5")
 
 
+def build_ranking_engine(districts, previous=None):
+    """
+    Ranking engine over the 2 PM samples of the district-wide forecasts, reusing
+    what did not change since the `previous` engine (see RankingEngine.from_forecasts).
+    """
+    _validate_districts(districts)
+
+    # Strict fetch: a new snapshot never starts out from expired forecasts, which would
+    # stretch its staleness bound by the serve-stale window
+    try:
+        weather_response, air_response = weather_api_many(
+            _district_weather_request(districts),
+            _district_air_request(districts),
+            serve_stale=False
+        )
+    except Exception as e:
+        logger.error(f"Error fetching weather or air data: {str(e)}", exc_info=True)
+        _raise_api_exception(e)
+
+    weather = _two_pm_values(weather_response)
+    air = _two_pm_values(air_response)
+
+    with stage("ranking"):
+        return RankingEngine.from_forecasts(districts, weather, air, previous=previous)
+
+
 def get_top_districts_to_visit(districts, result_range=10):
-    weather_df = get_batch_weather_info(districts)
-    air_df = get_batch_air_info(districts)
-    
-    combined_df = pd.merge(
-        weather_df,
-        air_df,
-        on=['district_name', 'date'],
-        suffixes=('_weather', '_air')
-    )
-
-    avg_df = combined_df.groupby("district_name").agg({
-        "temperature_2m": "mean",
-        "pm2_5": "mean",
-        "lat_weather": "first",
-        "long_weather": "first"
-    }).rename(columns={
-        "temperature_2m": "avg_temperature_2pm",
-        "pm2_5": "avg_pm2_5",
-        "lat_weather": "lat",
-        "long_weather": "long"
-    }).reset_index()
-
-    top_districts = avg_df.sort_values(
-        by=["avg_temperature_2pm", "avg_pm2_5"],
-        ascending=[True, True]
-    ).head(result_range)
-
-    return top_districts.to_dict(orient="records")
-
-
-def compare_weather(source, destination, date):
+    engine = build_ranking_engine(districts)
+    with stage("ranking"):
+        return engine.rank(result_range)
+
+
+def _value_at_local_hour(response, date, hour):
+    """
+    Value of a single-variable hourly response at `hour` o'clock local time on `date`,
+    or None when that hour is outside the response window.
+    """
+    hourly = response.Hourly()
+    local_start = hourly.Time() + response.UtcOffsetSeconds()
+    target = calendar.timegm(date.timetuple()) + hour * 3600
+    index, remainder = divmod(target - local_start, hourly.Interval())
+
+    values = hourly.Variables(0).ValuesAsNumpy()
+    if remainder or not 0 <= index < len(values):
+        return None
+    return float(values[index])
+
+
+def _values_at_local_hour(response, date, hour):
+    """
+    Values of every location of a batch response at `hour` o'clock local time on
+    `date`; NaN where that hour is outside the response window.
+    """
+    # Locations of one batch request share the time axis, so the position is found once
+    hourly = response[0].Hourly()
+    local_start = hourly.Time() + response[0].UtcOffsetSeconds()
+    target = calendar.timegm(date.timetuple()) + hour * 3600
+    index, remainder = divmod(target - local_start, hourly.Interval())
+
+    if remainder or not 0 <= index < len(hourly.Variables(0).ValuesAsNumpy()):
+        return np.full(len(response), np.nan)
+    return np.array([res.Hourly().Variables(0).ValuesAsNumpy()[index] for res in response], dtype=np.float64)
+
+
+def get_district_values_at(districts, date, hour=COMPARISON_HOUR):
+    """
+    Temperature and PM2.5 arrays of all districts at a local hour, read from the
+    district-wide forecasts the ranking keeps cached.
+    """
+    _validate_districts(districts)
+    travel_date = datetime.date.fromisoformat(date)
+
+    try:
+        weather_response, air_response = weather_api_many(
+            _district_weather_request(districts),
+            _district_air_request(districts)
+        )
+    except Exception as e:
+        logger.error(f"Error fetching weather or air data: {str(e)}", exc_info=True)
+        _raise_api_exception(e)
+
+    with stage("decode"):
+        return (
+            _values_at_local_hour(weather_response, travel_date, hour),
+            _values_at_local_hour(air_response, travel_date, hour),
+        )
+
+
+def _location_key(location):
+    return float(location["lat"]), float(location["long"])
+
+
+def _comparison_sides(comparison):
+    """(location, is_district) pairs whose forecasts a comparison needs, destination first."""
+    sides = [(comparison["destination"], True)]
+    if not comparison.get("source_values"):
+        sides.append((comparison["source"], bool(comparison.get("source_is_district"))))
+    return sides
+
+
+def _compare_weather_plan(comparisons):
+    for c in comparisons:
+        for location in [c["source"], c["destination"]]:
+            if not all(k in location for k in ("lat", "long")):
+                raise ValueError("Both source and destination must have 'lat' and 'long' keys.")
+
+    # Districts are read from the district-wide forecasts the ranking already fetched,
+    # so in the common case only arbitrary source coordinates go upstream. Source
+    # values that are already known (e.g. interpolated) need no request at all.
+    districts, points = {}, {}
+    for c in comparisons:
+        for location, is_district in _comparison_sides(c):
+            target = districts if is_district else points.setdefault(c["date"], {})
+            target[_location_key(location)] = location
+
+    def date_requests(locations_by_date):
+        return [
+            request
+            for date, locations in locations_by_date.items()
+            for request in (
+                (WEATHER_URL, _location_params(list(locations.values()), "temperature_2m", _hour_window(date))),
+                (AIR_URL, _location_params(list(locations.values()), "pm2_5", _hour_window(date))),
+            )
+        ]
+
+    def index_responses(locations_by_date, responses):
+        # (location key, date) -> (weather, air); date is None for district-wide forecasts
+        for n, (date, locations) in enumerate(locations_by_date.items()):
+            for key, weather, air in zip(locations, responses[2 * n], responses[2 * n + 1]):
+                forecasts[(key, date)] = (weather, air)
+
+    def values_at_comparison_hour(location, date):
+        key = _location_key(location)
+        weather, air = forecasts.get((key, date)) or forecasts[(key, None)]
+        travel_date = datetime.date.fromisoformat(date)
+        with stage("decode"):
+            return [
+                _value_at_local_hour(weather, travel_date, COMPARISON_HOUR),
+                _value_at_local_hour(air, travel_date, COMPARISON_HOUR),
+            ]
+
+    forecasts = {}
+    try:
+        responses = yield [
+            _district_weather_request(list(districts.values())),
+            _district_air_request(list(districts.values())),
+            *date_requests(points)
+        ]
+        index_responses({None: districts}, responses[:2])
+        index_responses(points, responses[2:])
+
+        # Travel dates outside the district forecast window fall back to date requests
+        fallback = {}
+        for c in comparisons:
+            for location, is_district in _comparison_sides(c):
+                if is_district and None in values_at_comparison_hour(location, c["date"]):
+                    fallback.setdefault(c["date"], {})[_location_key(location)] = location
+        if fallback:
+            index_responses(fallback, (yield date_requests(fallback)))
+    except Exception as e:
+        logger.error(f"Failed to fetch weather or air data: {str(e)}", exc_info=True)
+        _raise_api_exception(e)
+
+    results = []
+    for c in comparisons:
+        dest_values = values_at_comparison_hour(c["destination"], c["date"])
+        source_values = list(c.get("source_values") or values_at_comparison_hour(c["source"], c["date"]))
+        if None in dest_values or None in source_values:
+            results.append(None)
+            continue
+        results.append({
+            "temp_diff": dest_values[0] - source_values[0],
+            "air_con_diff": dest_values[1] - source_values[1],
+        })
+    return results
+
+
+def compare_weather_many(comparisons):
+    """
+    Batch form of compare_weather; `comparisons` are dicts of its arguments. All
+    districts involved are read from one district-wide request pair and the other
+    coordinates from one request pair per travel date, each location requested
+    once. Returns one result per comparison, or None where no forecast is available.
+    """
+    return _run_plan(_compare_weather_plan(comparisons))
+
+
+async def acompare_weather_many(comparisons):
+    return await _arun_plan(_compare_weather_plan(comparisons))
+
+
+def _single_comparison(source, destination, date, source_is_district, source_values):
+    return [{
+        "source": source,
+        "destination": destination,
+        "date": date,
+        "source_is_district": source_is_district,
+        "source_values": source_values,
+    }]
+
+
+def _comparison_result(results, date):
+    [result] = results
+    if result is None:
+        e = ValueError(f"No forecast available for {date} {COMPARISON_HOUR:02d}:00.")
+        logger.error(f"Failed to fetch weather or air data: {str(e)}")
+        _raise_api_exception(e)
+    return result
+
+
+def compare_weather(source, destination, date, source_is_district=False, source_values=None):
+    comparisons = _single_comparison(source, destination, date, source_is_district, source_values)
+    return _comparison_result(compare_weather_many(comparisons), date)
+
+
+async def acompare_weather(source, destination, date, source_is_district=False, source_values=None):
+    comparisons = _single_comparison(source, destination, date, source_is_district, source_values)
+    return _comparison_result(await acompare_weather_many(comparisons), date)
+
+
+def _range_window(start_date, end_date):
+    # The comparison hour of the first and the last day; the days between are read by stride
+    return {
+        "start_hour": f"{start_date}T{COMPARISON_HOUR:02d}:00",
+        "end_hour": f"{end_date}T{COMPARISON_HOUR:02d}:00"
+    }
+
+
+def _daily_values_at_local_hour(response, start_date, days, hour):
+    """
+    Values of a single-location response at `hour` o'clock local time on `days`
+    consecutive dates from `start_date`; NaN on dates outside the response window.
+    """
+    hourly = response.Hourly()
+    local_start = hourly.Time() + response.UtcOffsetSeconds()
+    targets = calendar.timegm(start_date.timetuple()) + hour * 3600 + _DAY_SECONDS * np.arange(days, dtype=np.int64)
+    index, remainder = np.divmod(targets - local_start, hourly.Interval())
+
+    values = hourly.Variables(0).ValuesAsNumpy()
+    valid = (remainder == 0) & (index >= 0) & (index < len(values))
+    daily = np.full(days, np.nan)
+    daily[valid] = values[index[valid]]
+    return daily
+
+
+def _compare_weather_range_plan(source, destination, start_date, end_date, source_is_district=False, source_values=None):
     for location in [source, destination]:
         if not all(k in location for k in ("lat", "long")):
             raise ValueError("Both source and destination must have 'lat' and 'long' keys.")
-        
-    weather_url = "https://api.open-meteo.com/v1/forecast"
-    air_url = "https://air-quality-api.open-meteo.com/v1/air-quality"
-
-    common_params = {
-        "timezone": "Asia/Dhaka",
-        "start_date": date,
-        "end_date": date
-    }
 
-    weather_params = {
-        **common_params,
-        "latitude": [source['lat'], destination['lat']],
-        "longitude": [source['long'], destination['long']],
-        "hourly": "temperature_2m",
-    }
+    start, end = datetime.date.fromisoformat(start_date), datetime.date.fromisoformat(end_date)
+    days = (end - start).days + 1
+    dates = [(start + datetime.timedelta(days=n)).isoformat() for n in range(days)]
 
-    air_params = {
-        **common_params,
-        "latitude": [source['lat'], destination['lat']],
-        "longitude": [source['long'], destination['long']],
-        "hourly": "pm2_5",
-    }
+    today = _local_today()
+    in_district_window = start >= today and (end - today).days < DISTRICT_FORECAST_DAYS
+
+    sides = [(destination, True)]
+    if source_values is None:
+        sides.append((source, source_is_district))
+    # Districts share the cached district-wide forecasts; anything else is one range request
+    districts = [location for location, is_district in sides if is_district and in_district_window]
+    points = [location for location, is_district in sides if not (is_district and in_district_window)]
+
+    requests = []
+    if districts:
+        requests += [_district_weather_request(districts), _district_air_request(districts)]
+    if points:
+        requests += [
+            (WEATHER_URL, _location_params(points, "temperature_2m", _range_window(start_date, end_date))),
+            (AIR_URL, _location_params(points, "pm2_5", _range_window(start_date, end_date))),
+        ]
 
     try:
-        weather_responses = openmeteo_client.weather_api(weather_url, params=weather_params)
-        air_responses = openmeteo_client.weather_api(air_url, params=air_params)
+        responses = yield requests
     except Exception as e:
         logger.error(f"Failed to fetch weather or air data: {str(e)}", exc_info=True)
-        try:
-            raise APIException(detail=ast.literal_eval(str(e)))
-        except Exception:
-            raise APIException(detail={"error": True, "reason": str(e)})
-
-    result = {
-        "temp_diff": float(weather_responses[1].Hourly().Variables(0).ValuesAsNumpy()[13]) -
-                      float(weather_responses[0].Hourly().Variables(0).ValuesAsNumpy()[13]),
-        "air_con_diff": float(air_responses[1].Hourly().Variables(0).ValuesAsNumpy()[13]) -
-                        float(air_responses[0].Hourly().Variables(0).ValuesAsNumpy()[13]),
-    }
+        _raise_api_exception(e)
+
+    forecasts = {}
+    for n, locations in enumerate(group for group in (districts, points) if group):
+        for location, weather, air in zip(locations, responses[2 * n], responses[2 * n + 1]):
+            forecasts[_location_key(location)] = (weather, air)
+
+    def daily_values(location):
+        weather, air = forecasts[_location_key(location)]
+        with stage("decode"):
+            return np.stack([
+                _daily_values_at_local_hour(weather, start, days, COMPARISON_HOUR),
+                _daily_values_at_local_hour(air, start, days, COMPARISON_HOUR),
+            ])
+
+    dest_values = daily_values(destination)
+    if source_values is None:
+        source_values = daily_values(source)
+    else:
+        source_values = np.asarray(source_values, dtype=np.float64).T
+    temp_diff, air_con_diff = dest_values - source_values
+
+    # Best day: recommended days (cooler and cleaner) first, then coolest, then cleanest
+    forecast = np.flatnonzero(~np.isnan(temp_diff) & ~np.isnan(air_con_diff))
+    best = None
+    if len(forecast):
+        recommended = (temp_diff[forecast] < 0) & (air_con_diff[forecast] < 0)
+        order = np.lexsort((air_con_diff[forecast], temp_diff[forecast], ~recommended))
+        best = int(forecast[order[0]])
+
+    return {"dates": dates, "temp_diff": temp_diff, "air_con_diff": air_con_diff, "best": best}
+
+
+def compare_weather_range(source, destination, start_date, end_date, source_is_district=False, source_values=None):
+    """
+    compare_weather for every date from `start_date` to `end_date`, both inclusive,
+    from one upstream call: each side is a single request pair covering the range.
+    Districts are read from the district-wide forecasts when the range fits in
+    their window. `source_values`, when given, is a (temperature, PM2.5) pair per day.
+    Returns the dates, per-day temp_diff / air_con_diff arrays (NaN on days without
+    a forecast) and the index of the best day, or None when no day has a forecast.
+    """
+    return _run_plan(_compare_weather_range_plan(
+        source, destination, start_date, end_date, source_is_district, source_values
+    ))
+
 
-    return result
\ No newline at end of file
+async def acompare_weather_range(source, destination, start_date, end_date, source_is_district=False, source_values=None):
+    return await _arun_plan(_compare_weather_range_plan(
+        source, destination, start_date, end_date, source_is_district, source_values
+    ))
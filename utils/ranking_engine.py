@@ -0,0 +1,179 @@
+import hashlib
+import warnings
+import numpy as np
+
+
+def series_digest(times, values):
+    """Content digest of one (times, values) series of 2 PM samples."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(times, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(values, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class _Aggregate:
+    """(districts, days) values of one variable with running sums and counts of the non-NaN values."""
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(self.values)
+        pad = ((0, 0), (1, 0))
+        self.sums = np.pad(np.cumsum(np.where(present, self.values, 0.0), axis=1), pad)
+        self.counts = np.pad(np.cumsum(present, axis=1), pad)
+
+    def averages(self, first, last):
+        return (self.sums[:, last] - self.sums[:, first]) / (self.counts[:, last] - self.counts[:, first])
+
+
+class RankingEngine:
+    """
+    Daily 2 PM temperature and PM2.5 of every district kept as prefix sums over
+    the days both series cover, so the averages over any day window cost one
+    subtraction per district. Rankings for any (k, window, weights) are computed
+    from these arrays without refetching anything.
+
+    Each variable is tracked with the digest of the series it was built from, so a
+    refresh recomputes only the variables whose upstream data changed.
+    """
+    def __init__(self, districts, days, temperature, pm2_5, digests=(None, None)):
+        self.districts = [{"name": d["name"], "lat": d["lat"], "long": d["long"]} for d in districts]
+        self.days = np.asarray(days, dtype="datetime64[D]")
+        shape = (len(self.districts), len(self.days))
+        self._temperature = temperature if isinstance(temperature, _Aggregate) else _Aggregate(np.reshape(temperature, shape))
+        self._pm2_5 = pm2_5 if isinstance(pm2_5, _Aggregate) else _Aggregate(np.reshape(pm2_5, shape))
+        self.digests = tuple(digests)
+
+        # Position of each district in name order, the final tie-breaker
+        by_name = np.argsort(np.array([d["name"] for d in self.districts]), kind="stable")
+        self._name_rank = np.empty(len(by_name), dtype=np.int64)
+        self._name_rank[by_name] = np.arange(len(by_name))
+
+    @property
+    def temperature(self):
+        return self._temperature.values
+
+    @property
+    def pm2_5(self):
+        return self._pm2_5.values
+
+    @classmethod
+    def from_forecasts(cls, districts, weather, air, previous=None):
+        """
+        Engine over the days shared by two (times, values) series of 2 PM samples.
+        With the `previous` engine of the same districts, a series whose digest is
+        unchanged reuses its aggregates, and `previous` itself is returned when
+        neither changed.
+        """
+        digests = (series_digest(*weather), series_digest(*air))
+        if previous is not None and previous.districts != [
+            {"name": d["name"], "lat": d["lat"], "long": d["long"]} for d in districts
+        ]:
+            previous = None
+        if previous is not None and previous.digests == digests:
+            return previous
+
+        (weather_times, weather_values), (air_times, air_values) = weather, air
+        times, weather_days, air_days = np.intersect1d(weather_times, air_times, return_indices=True)
+        days = np.asarray(times, dtype="datetime64[s]").astype("datetime64[D]")
+        # Aggregates are only reusable while the shared days are the same
+        if previous is not None and not np.array_equal(previous.days, days):
+            previous = None
+
+        def aggregate(index, values, source_days):
+            if previous is not None and previous.digests[index] == digests[index]:
+                return (previous._temperature, previous._pm2_5)[index]
+            return _Aggregate(values[:, source_days])
+
+        return cls(
+            districts, days,
+            aggregate(0, weather_values, weather_days),
+            aggregate(1, air_values, air_days),
+            digests=digests
+        )
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(
+            payload["districts"], payload["days"], payload["temperature"], payload["pm2_5"],
+            digests=payload.get("digests", (None, None))
+        )
+
+    def to_payload(self):
+        # NaN is not valid JSON; missing values are stored as null
+        def rows(values):
+            return [[None if np.isnan(v) else float(v) for v in row] for row in values]
+
+        return {
+            "districts": self.districts,
+            "days": [str(day) for day in self.days],
+            "temperature": rows(self.temperature),
+            "pm2_5": rows(self.pm2_5),
+            "digests": list(self.digests),
+        }
+
+    def __len__(self):
+        return len(self.districts)
+
+    def _day_span(self, start=None, end=None):
+        first = 0 if start is None else np.searchsorted(self.days, np.datetime64(start, "D"), side="left")
+        last = len(self.days) if end is None else np.searchsorted(self.days, np.datetime64(end, "D"), side="right")
+        return int(first), int(max(first, last))
+
+    def averages(self, start=None, end=None):
+        """Average temperature and PM2.5 per district over the days from `start` to `end` (inclusive)."""
+        first, last = self._day_span(start, end)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # A district without any value in the window averages to NaN and ranks last
+            return self._temperature.averages(first, last), self._pm2_5.averages(first, last)
+
+    def rank(self, k=10, start=None, end=None, weights=None):
+        """
+        Top `k` districts over the window. Without `weights` districts are ordered
+        by (temperature, PM2.5); with (temperature_weight, pm2_5_weight) by the
+        weighted sum of both averages standardized across districts, lower first.
+        Ties are broken by name.
+        """
+        first, last = self._day_span(start, end)
+        k = min(k, len(self))
+        if first == last or k < 1:
+            return []
+
+        temperature, pm2_5 = self.averages(start, end)
+        score = None
+        if weights is None:
+            primary, secondary = temperature, pm2_5
+        else:
+            with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+                warnings.simplefilter("ignore", RuntimeWarning)
+                standardized = [
+                    np.nan_to_num((v - np.nanmean(v)) / np.nanstd(v), nan=0.0, posinf=0.0, neginf=0.0)
+                    for v in (temperature, pm2_5)
+                ]
+            score = weights[0] * standardized[0] + weights[1] * standardized[1]
+            score[np.isnan(temperature) | np.isnan(pm2_5)] = np.nan
+            primary, secondary = score, temperature
+
+        # Everything tied with the k-th best is kept so the name tie-break stays deterministic
+        filled = np.where(np.isnan(primary), np.inf, primary)
+        if k < len(self):
+            kth = filled[np.argpartition(filled, k - 1)[k - 1]]
+            candidates = np.flatnonzero(filled <= kth)
+        else:
+            candidates = np.arange(len(self))
+        # np.lexsort is stable and sorts by its last key first
+        order = candidates[np.lexsort((
+            self._name_rank[candidates], secondary[candidates], filled[candidates]
+        ))][:k]
+
+        records = []
+        for i in order:
+            record = {
+                "district_name": self.districts[i]["name"],
+                "avg_temperature_2pm": float(temperature[i]),
+                "avg_pm2_5": float(pm2_5[i]),
+                "lat": self.districts[i]["lat"],
+                "long": self.districts[i]["long"]
+            }
+            if score is not None:
+                record["score"] = float(score[i])
+            records.append(record)
+        return records
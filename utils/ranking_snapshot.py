@@ -0,0 +1,162 @@
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from django.conf import settings
+
+from utils.district_registry import get_registry
+from utils.openmateo_client import build_ranking_engine
+from utils.ranking_engine import RankingEngine
+from utils.timing import stage
+from utils.shared_files import write_atomic, file_mtime, PollInterval
+
+
+logger = logging.getLogger(__name__)
+
+# How often a worker stats the snapshot file for a newer version
+_disk_poll = PollInterval(seconds=1.0)
+
+_snapshot = None
+_snapshot_mtime = None
+_build_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class RankingSnapshot:
+    """
+    Immutable, fully ranked list of districts and the ranking engine it was
+    ranked with, which answers parameterized rankings. Readers only ever see a
+    complete snapshot because a new one replaces the old by a single reference swap.
+    """
+    records: list
+    built_at: float
+    engine: RankingEngine = None
+    # When the ranking last changed; refreshes with unchanged forecasts keep it
+    changed_at: float = None
+    # Response bodies rendered from this snapshot, filled by the view on first use
+    rendered: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def age(self):
+        return time.time() - self.built_at
+
+    @property
+    def modified_at(self):
+        return self.changed_at or self.built_at
+
+    @property
+    def version(self):
+        """Digests of the forecasts the ranking was built from."""
+        if self.engine is None or None in self.engine.digests:
+            return str(self.built_at)
+        return "-".join(self.engine.digests)
+
+
+def _swap(snapshot, mtime=None):
+    global _snapshot, _snapshot_mtime
+    _snapshot = snapshot
+    _snapshot_mtime = mtime
+
+
+def build_snapshot(districts, previous=None):
+    """
+    Ranks `districts` from the current forecasts. Against the `previous` snapshot
+    only the variables whose 2 PM samples changed are recomputed, and unchanged
+    forecasts keep the previous ranking as it is.
+    """
+    engine = build_ranking_engine(districts, previous=previous.engine if previous else None)
+    now = time.time()
+    if previous is not None and engine is previous.engine:
+        return RankingSnapshot(records=previous.records, built_at=now, engine=engine, changed_at=previous.modified_at)
+    return RankingSnapshot(records=engine.rank(len(engine)), built_at=now, engine=engine, changed_at=now)
+
+
+def save_snapshot(snapshot):
+    path = settings.RANKING_SNAPSHOT_PATH
+    payload = {
+        "built_at": snapshot.built_at,
+        "changed_at": snapshot.changed_at,
+        "records": snapshot.records,
+        "engine": snapshot.engine.to_payload()
+    }
+
+    return write_atomic(path, json.dumps(payload, separators=(',', ':')))
+
+
+def _reload_from_disk():
+    path = settings.RANKING_SNAPSHOT_PATH
+    mtime = file_mtime(path)
+    if mtime is None or mtime == _snapshot_mtime:
+        return
+
+    try:
+        with open(path, 'r') as f:
+            payload = json.load(f)
+        snapshot = RankingSnapshot(
+            records=payload["records"],
+            built_at=payload["built_at"],
+            engine=RankingEngine.from_payload(payload["engine"]),
+            changed_at=payload.get("changed_at")
+        )
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable ranking snapshot {path}: {e}")
+        return
+
+    if _snapshot is None or snapshot.built_at > _snapshot.built_at:
+        _swap(snapshot, mtime)
+
+
+def refresh_snapshot(districts=None, force=False):
+    """
+    Rebuilds the snapshot and publishes it to this process and, through the
+    snapshot file, to every other worker. Concurrent callers wait for a single build.
+    """
+    with _build_lock:
+        # A fresh process (e.g. `refresh_rankings --once`) builds on the published snapshot
+        if _snapshot is None:
+            _reload_from_disk()
+        current = _snapshot
+        if not force and current is not None and current.age < settings.RANKING_REFRESH_INTERVAL:
+            return current
+
+        snapshot = build_snapshot(districts if districts is not None else get_registry(), previous=current)
+        try:
+            mtime = save_snapshot(snapshot)
+        except OSError as e:
+            logger.warning(f"Unable to persist ranking snapshot: {e}")
+            mtime = None
+        _swap(snapshot, mtime)
+        return snapshot
+
+
+def get_snapshot(districts=None):
+    """
+    Returns the current snapshot without touching the upstream APIs. A snapshot is
+    at most RANKING_MAX_STALENESS seconds old: past that bound it is rebuilt inline.
+    """
+    if _disk_poll.due():
+        _reload_from_disk()
+
+    snapshot = _snapshot
+    if snapshot is None or snapshot.age > settings.RANKING_MAX_STALENESS:
+        snapshot = refresh_snapshot(districts)
+    return snapshot
+
+
+def snapshot_is_current():
+    """True while get_snapshot() can answer from memory instead of rebuilding inline."""
+    snapshot = _snapshot
+    return snapshot is not None and snapshot.age <= settings.RANKING_MAX_STALENESS
+
+
+def get_top_districts(districts=None, result_range=10, start=None, end=None, weights=None, snapshot=None):
+    """
+    Top districts from `snapshot` or the current snapshot. The default ranking over
+    the whole forecast is precomputed; a window or weights are ranked by the snapshot's engine.
+    """
+    snapshot = snapshot or get_snapshot(districts)
+    if start is None and end is None and weights is None:
+        return snapshot.records[:result_range]
+    with stage("ranking"):
+        return snapshot.engine.rank(result_range, start=start, end=end, weights=weights)
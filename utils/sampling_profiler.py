@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import threading
+import itertools
+from collections import Counter
+from django.conf import settings
+
+from utils.shared_files import write_atomic, file_mtime, PollInterval
+
+
+logger = logging.getLogger(__name__)
+
+# How often a worker stats the control file for a runtime toggle
+_control_poll = PollInterval(seconds=1.0)
+# Deepest stack recorded per sample
+_MAX_DEPTH = 128
+
+_control = None
+_control_mtime = None
+
+
+def _defaults():
+    return {
+        "enabled": settings.PROFILER_ENABLED,
+        "sample_rate": settings.PROFILER_SAMPLE_RATE,
+        "latency_threshold_ms": settings.PROFILER_LATENCY_THRESHOLD_MS,
+    }
+
+
+def current_config():
+    """
+    Profiler settings, overridden at runtime by the control file. Workers pick up
+    a change within a second, so one toggle applies to the whole deployment.
+    """
+    global _control, _control_mtime
+
+    if not _control_poll.due(force=_control is None):
+        return _control
+
+    path = settings.PROFILER_CONTROL_PATH
+    mtime = file_mtime(path)
+    if mtime is None:
+        _control, _control_mtime = _defaults(), None
+        return _control
+
+    if _control is None or mtime != _control_mtime:
+        try:
+            with open(path, 'r') as f:
+                _control = {**_defaults(), **json.load(f)}
+            _control_mtime = mtime
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable profiler control file: {e}")
+            _control = _control or _defaults()
+    return _control
+
+
+def update_config(**changes):
+    global _control, _control_mtime
+
+    config = {**current_config(), **changes}
+    _control, _control_mtime = config, write_atomic(settings.PROFILER_CONTROL_PATH, json.dumps(config))
+    return config
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame):
+    names = []
+    while frame is not None and len(names) < _MAX_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _Trace:
+    __slots__ = ("thread_id", "started", "always", "threshold", "samples")
+
+    def __init__(self, always, threshold):
+        self.thread_id = threading.get_ident()
+        self.started = time.monotonic()
+        self.always = always
+        self.threshold = threshold
+        self.samples = Counter()
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for request threads. A single sampler thread reads the
+    stacks of traced threads every `interval` seconds and sleeps while nothing is
+    traced. Samples are aggregated into folded stacks ("a;b;c count"), the input
+    format of flamegraph.pl and speedscope, in one file per worker.
+    """
+    def __init__(self, interval=0.005, flush_interval=10.0):
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._active = {}
+        self._wakeup = threading.Event()
+        self._thread_pid = None
+        self._stacks = Counter()
+        self._flushed_at = time.monotonic()
+
+    def _ensure_sampler(self):
+        # A sampler inherited through fork() is not running in the child
+        if self._thread_pid != os.getpid():
+            with self._lock:
+                if self._thread_pid != os.getpid():
+                    self._thread_pid = os.getpid()
+                    self._stacks = Counter()
+                    threading.Thread(target=self._run, name="sampling-profiler", daemon=True).start()
+
+    def begin(self, always=False, threshold=0.0):
+        """
+        Starts tracing the calling thread. `always` samples it from the start;
+        otherwise sampling begins once it has run for `threshold` seconds.
+        """
+        self._ensure_sampler()
+        trace = _Trace(always, threshold)
+        with self._lock:
+            self._active[trace.thread_id] = trace
+        self._wakeup.set()
+        return trace
+
+    def end(self, trace, label):
+        with self._lock:
+            self._active.pop(trace.thread_id, None)
+            if not trace.samples:
+                return
+            for stack, count in trace.samples.items():
+                self._stacks[f"{label};{stack}"] += count
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def _run(self):
+        while True:
+            if not self._active:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            time.sleep(self.interval)
+            now = time.monotonic()
+            frames = sys._current_frames()
+            with self._lock:
+                for trace in self._active.values():
+                    if not trace.always and now - trace.started < trace.threshold:
+                        continue
+                    frame = frames.get(trace.thread_id)
+                    if frame is not None:
+                        trace.samples[_fold(frame)] += 1
+            del frames
+
+    def output_path(self):
+        return os.path.join(settings.PROFILER_OUTPUT_DIR, f"profile-{os.getpid()}.folded")
+
+    def flush(self):
+        with self._lock:
+            stacks = dict(self._stacks)
+            self._flushed_at = time.monotonic()
+        if not stacks:
+            return
+
+        path = self.output_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            write_atomic(path, "".join(f"{stack} {count}\n" for stack, count in stacks.items()))
+        except Exception:
+            logger.error("Failed to write profile", exc_info=True)
+
+
+profiler = SamplingProfiler(interval=settings.PROFILER_INTERVAL_MS / 1000)
+atexit.register(profiler.flush)
+
+_request_counter = itertools.count(1)
+
+
+def should_sample(sample_rate):
+    """True for every `sample_rate`-th request; 0 disables rate-based sampling."""
+    return bool(sample_rate) and next(_request_counter) % sample_rate == 0
@@ -0,0 +1,47 @@
+import os
+import time
+import tempfile
+
+
+def write_atomic(path, content):
+    """
+    Writes `content` to a temp file in the same directory, then renames it over
+    `path`, so other workers never read a half-written file. Returns the new mtime.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return os.stat(path).st_mtime
+
+
+def file_mtime(path):
+    """Modification time of `path`, or None when it does not exist."""
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+class PollInterval:
+    """
+    Throttles how often a worker stats a file other workers may replace:
+    `due()` is true at most once per `seconds`.
+    """
+    def __init__(self, seconds=1.0):
+        self.seconds = seconds
+        self._checked_at = 0.0
+
+    def due(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.seconds:
+            return False
+        self._checked_at = now
+        return True
+
+    def reset(self):
+        self._checked_at = 0.0
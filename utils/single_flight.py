@@ -0,0 +1,77 @@
+import os
+import asyncio
+import hashlib
+import threading
+import functools
+import concurrent.futures
+from contextlib import asynccontextmanager
+
+
+_LOCK_POLL_INTERVAL = 0.05
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution. Callers
+    arriving while the first one is in flight await its result instead of
+    running their own. Works across event loops and threads of one process.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = set()
+
+    def in_flight(self):
+        return len(self._calls)
+
+    async def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = self._calls[key] = concurrent.futures.Future()
+                # Runs detached from the caller that started it, so cancelling any
+                # one caller (e.g. a client disconnect) leaves the call to the others
+                task = asyncio.ensure_future(func())
+                self._tasks.add(task)
+                task.add_done_callback(functools.partial(self._finish, key, future))
+
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _finish(self, key, future, task):
+        self._tasks.discard(task)
+        with self._lock:
+            self._calls.pop(key, None)
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+
+@asynccontextmanager
+async def worker_lock(lock_dir, key):
+    """
+    Exclusive lock shared by every worker process on this host (POSIX flock).
+    A no-op when `lock_dir` is not configured.
+    """
+    if not lock_dir:
+        yield
+        return
+
+    import fcntl
+
+    path = os.path.join(lock_dir, f"{hashlib.sha1(key.encode()).hexdigest()}.lock")
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        # Poll without blocking so waiting never ties up a thread and stays cancellable
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                await asyncio.sleep(_LOCK_POLL_INTERVAL)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
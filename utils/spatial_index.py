@@ -0,0 +1,96 @@
+import math
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088
+# Length of one degree of latitude
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat, long, lats, longs):
+    """Great-circle distances from one point to arrays of points."""
+    lat, long, lats, longs = map(np.radians, (lat, long, lats, longs))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((longs - long) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """
+    Uniform lat/long grid over a fixed set of points. A nearest query scans rings
+    of cells around the query cell and stops once no unvisited ring can hold a
+    point closer than the current k-th best.
+    """
+    def __init__(self, lats, longs, cell_degrees=0.5):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.longs = np.asarray(longs, dtype=np.float64)
+        self.cell_degrees = cell_degrees
+
+        cells = {}
+        for i, cell in enumerate(zip(*self._cells(self.lats, self.longs))):
+            cells.setdefault(cell, []).append(i)
+        self._cells_to_points = {cell: np.array(points) for cell, points in cells.items()}
+
+        if cells:
+            rows, cols = zip(*cells)
+            self._row_range = (min(rows), max(rows))
+            self._col_range = (min(cols), max(cols))
+
+    def _cells(self, lats, longs):
+        return (
+            np.floor(np.asarray(lats) / self.cell_degrees).astype(int).tolist(),
+            np.floor(np.asarray(longs) / self.cell_degrees).astype(int).tolist(),
+        )
+
+    def _ring(self, row, col, radius):
+        if radius == 0:
+            yield row, col
+            return
+        for c in range(col - radius, col + radius + 1):
+            yield row - radius, c
+            yield row + radius, c
+        for r in range(row - radius + 1, row + radius):
+            yield r, col - radius
+            yield r, col + radius
+
+    def _ring_min_km(self, lat, radius):
+        """Lower bound of the distance from the query to any point in ring `radius`."""
+        if radius <= 1:
+            return 0.0
+        degrees = (radius - 1) * self.cell_degrees
+        # A degree of longitude is shortest at the ring's highest latitude
+        widest_lat = min(90.0, abs(lat) + radius * self.cell_degrees)
+        return degrees * _KM_PER_DEGREE * max(math.cos(math.radians(widest_lat)), 0.0)
+
+    def nearest(self, lat, long, k=1, max_km=None):
+        """Indices and distances (km) of up to `k` nearest points, closest first."""
+        if not self._cells_to_points or k < 1:
+            return np.array([], dtype=int), np.array([])
+
+        (row,), (col,) = self._cells([lat], [long])
+        max_radius = max(
+            abs(row - self._row_range[0]), abs(row - self._row_range[1]),
+            abs(col - self._col_range[0]), abs(col - self._col_range[1]),
+        )
+
+        found = []
+        for radius in range(max_radius + 1):
+            bound = self._ring_min_km(lat, radius)
+            if max_km is not None and bound > max_km:
+                break
+            if len(found) >= k and bound > np.sort(np.concatenate(found)[:, 1])[k - 1]:
+                break
+            for cell in self._ring(row, col, radius):
+                points = self._cells_to_points.get(cell)
+                if points is not None:
+                    distances = haversine_km(lat, long, self.lats[points], self.longs[points])
+                    found.append(np.column_stack((points, distances)))
+
+        if not found:
+            return np.array([], dtype=int), np.array([])
+        candidates = np.concatenate(found)
+        order = np.argsort(candidates[:, 1], kind="stable")[:k]
+        indices, distances = candidates[order, 0].astype(int), candidates[order, 1]
+        if max_km is not None:
+            within = distances <= max_km
+            indices, distances = indices[within], distances[within]
+        return indices, distances
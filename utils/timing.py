@@ -0,0 +1,104 @@
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+
+
+# Upper bounds (seconds) of the histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage durations (ms) of the request being handled in this context
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class StageMetrics:
+    """
+    Per-process histograms of hot-path stage durations, keyed by (metric, label).
+    Each worker exposes its own; the scraper aggregates across workers.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, metric, label, seconds):
+        with self._lock:
+            histogram = self._histograms.get((metric, label))
+            if histogram is None:
+                histogram = self._histograms[(metric, label)] = Histogram()
+            histogram.observe(seconds)
+
+    def render(self):
+        """Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            lines = []
+            described = set()
+            for (metric, label), histogram in items:
+                name = f"weather_api_{metric}_duration_seconds"
+                label_name = "stage" if metric == "stage" else "view"
+                if name not in described:
+                    described.add(name)
+                    lines.append(f"# HELP {name} Time spent per {label_name}.")
+                    lines.append(f"# TYPE {name} histogram")
+                for bound, count in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{label_name}="{label}",le="{le}"}} {count}')
+                lines.append(f'{name}_sum{{{label_name}="{label}"}} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{{{label_name}="{label}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = StageMetrics()
+
+
+@contextmanager
+def stage(name):
+    """
+    Times a hot-path stage. The duration feeds the stage histogram and, inside a
+    request, that request's Server-Timing header.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.observe("stage", name, elapsed)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + elapsed * 1000
+
+
+def start_request():
+    stages = {}
+    return stages, _request_stages.set(stages)
+
+
+def end_request(token):
+    _request_stages.reset(token)
+
+
+def server_timing_header(stages, total_ms):
+    entries = [f"{name};dur={duration:.2f}" for name, duration in stages.items()]
+    entries.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(entries)